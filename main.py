@@ -45,6 +45,9 @@ class TranslatorApp:
     def on_closing(self):
         """应用关闭时的处理"""
         try:
+            # 写完待保存的译文快照（保存线程是守护线程，销毁窗口后会被直接终止）
+            if not self.main_window.flush_saves():
+                print("关闭应用时译文保存超时，最近的修改可能未写入")
             # 保存配置
             self.config_manager.save_config()
             self.root.destroy()
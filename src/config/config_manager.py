@@ -76,27 +76,31 @@ class ConfigManager:
 - 第四层：完整性保证 - 确保翻译的完整性和准确性
 严禁重复提示词到翻译内容中，翻译严禁出现错字漏字，错字漏字会被定义为失败，严禁任何失败。"""
         
+    def _read_json(self, path: Path) -> Any:
+        """读取JSON配置文件"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+            
     def load_api_config(self) -> Dict[str, Any]:
         """加载API配置"""
         try:
             if self.api_config_file.exists():
-                with open(self.api_config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    # 合并默认配置，确保所有字段都存在
-                    merged_config = self.default_api_config.copy()
-                    
-                    # 确保 provider_keys 存在
-                    if "provider_keys" not in config:
-                        config["provider_keys"] = {"siliconflow": "", "deepseek": ""}
-                    
-                    merged_config.update(config)
-                    
-                    # 同步当前提供商的密钥
-                    provider = merged_config.get("provider", "siliconflow")
-                    if provider in merged_config["provider_keys"]:
-                        merged_config["api_key"] = merged_config["provider_keys"][provider]
-                    
-                    return merged_config
+                config = self._read_json(self.api_config_file)
+                # 合并默认配置，确保所有字段都存在
+                merged_config = self.default_api_config.copy()
+                
+                # 确保 provider_keys 存在
+                if "provider_keys" not in config:
+                    config["provider_keys"] = {"siliconflow": "", "deepseek": ""}
+                
+                merged_config.update(config)
+                
+                # 同步当前提供商的密钥
+                provider = merged_config.get("provider", "siliconflow")
+                if provider in merged_config["provider_keys"]:
+                    merged_config["api_key"] = merged_config["provider_keys"][provider]
+                
+                return merged_config
         except Exception as e:
             print(f"加载API配置失败: {e}")
             
@@ -135,11 +139,10 @@ class ConfigManager:
         """加载应用配置"""
         try:
             if self.app_config_file.exists():
-                with open(self.app_config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    merged_config = self.default_app_config.copy()
-                    merged_config.update(config)
-                    return merged_config
+                config = self._read_json(self.app_config_file)
+                merged_config = self.default_app_config.copy()
+                merged_config.update(config)
+                return merged_config
         except Exception as e:
             print(f"加载应用配置失败: {e}")
             
@@ -160,11 +163,10 @@ class ConfigManager:
         """加载术语库"""
         try:
             if self.glossary_file.exists():
-                with open(self.glossary_file, 'r', encoding='utf-8') as f:
-                    glossary = json.load(f)
-                    merged_glossary = self.default_glossary.copy()
-                    merged_glossary.update(glossary)
-                    return merged_glossary
+                glossary = self._read_json(self.glossary_file)
+                merged_glossary = self.default_glossary.copy()
+                merged_glossary.update(glossary)
+                return merged_glossary
         except Exception as e:
             print(f"加载术语库失败: {e}")
             
@@ -263,8 +265,7 @@ class ConfigManager:
             # 加载现有预设
             presets = {}
             if presets_file.exists():
-                with open(presets_file, 'r', encoding='utf-8') as f:
-                    presets = json.load(f)
+                presets = self._read_json(presets_file)
                     
             # 添加新预设
             presets[preset_name] = {
@@ -288,8 +289,7 @@ class ConfigManager:
         try:
             presets_file = self.config_dir / "api_presets.json"
             if presets_file.exists():
-                with open(presets_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                return self._read_json(presets_file)
         except Exception as e:
             print(f"加载API预设失败: {e}")
             
@@ -302,8 +302,7 @@ class ConfigManager:
             if not presets_file.exists():
                 return False
                 
-            with open(presets_file, 'r', encoding='utf-8') as f:
-                presets = json.load(f)
+            presets = self._read_json(presets_file)
                 
             if preset_name in presets:
                 del presets[preset_name]
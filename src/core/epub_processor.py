@@ -13,10 +13,15 @@ from typing import Dict, List, Tuple
 import json
 import base64
 import datetime
+import threading
+
+from ..utils.file_handler import atomic_write
 
 
 class EPUBProcessor:
     BLOCK_TAGS = {"p", "h1", "h2", "h3", "h4", "h5", "h6", "li", "blockquote", "caption", "figcaption"}
+    # 界面线程与后台保存线程都会读改写content_mapping.json，读-改-写全程持有此锁
+    _mapping_lock = threading.Lock()
 
     @staticmethod
     def _normalize_chapter_id(name: str) -> str:
@@ -403,6 +408,12 @@ class EPUBProcessor:
         - 未翻译的行保持空字符串
         """
         md = Path(mapping_dir) / "content_mapping.json"
+        with self._mapping_lock:
+            self._save_translations_locked(md, translated_lines)
+
+    @staticmethod
+    def _save_translations_locked(md: Path, translated_lines: List[str]) -> None:
+        """save_translations 的实际读改写（调用方需持有 _mapping_lock）"""
         obj = json.loads(md.read_text(encoding="utf-8"))
         items = obj.get("content_mappings", {})
         now = datetime.datetime.now().isoformat()
@@ -426,7 +437,9 @@ class EPUBProcessor:
                 items[key]["translated_at"] = now
         
         obj["project_info"]["updated_at"] = now
-        md.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
+        
+        # 原子替换写入，读取方不会看到写了一半的JSON
+        atomic_write(md, json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8"))
 
     def export_epub(self, mapping_dir: str, output_path: str) -> str:
         """根据mapping重建并导出EPUB（保留原结构与样式，文本替换为译文）。
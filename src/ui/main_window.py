@@ -7,16 +7,22 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import threading
-import os
+import queue
+import heapq
+import re
+import time
 from pathlib import Path
 
 from .settings_window import SettingsWindow
 from .glossary_window import GlossaryWindow
 from ..core.translator import TranslatorEngine
-from ..utils.file_handler import FileHandler
+from ..utils.file_handler import FileHandler, atomic_write
 from ..core.epub_processor import EPUBProcessor
 
 class MainWindow:
+    # 流式文本空行折叠：连续空行（含仅空白的行）合并为一个
+    _collapse_blank_re = re.compile(r'\n\s*\n')
+    
     def __init__(self, root, config_manager):
         self.root = root
         self.config_manager = config_manager
@@ -38,14 +44,54 @@ class MainWindow:
         # 翻译累积缓冲区：用于收集流式翻译的片段
         self._translation_buffer = []  # 累积当前翻译的所有片段
         self._continue_start_line = 0  # 续翻起始行
+        # 上次自动滚动表格的时间（流式更新时限制滚动频率）
+        self._last_see_time = 0.0
+        
+        # 表格行数据缓存（按列存储，与Treeview同步写入），热路径无需回读Tcl
+        self._src_col = []  # 原文列
+        self._tgt_col = []  # 译文列
+        # 待翻译行集合（原文非空但译文为空的行索引），随单元格写入增量维护
+        self._empty_target_rows = set()
+        # 表格项ID（按行顺序）与已翻译行数，避免热路径调用get_children()遍历Tcl
+        self._row_items = []
+        self._translated_count = 0
 
+        # 选中行翻译/翻译查漏的临时状态
+        self._selected_translation_data = []
+        self._missing_translation_indices = []
+        self._is_missing_check = False
+        # 本轮查漏开始前的空行集合，用于判断查漏是否取得进展
+        self._last_missing_set = frozenset()
+        
+        # 实时保存：自动保存开关与防抖任务表
+        self._disable_auto_save = False
+        self._debouncers = {}
+        # 后台保存线程：界面线程只投递最新快照（新快照覆盖未写入的旧快照），磁盘IO在保存线程执行
+        self._save_slot = None
+        self._save_lock = threading.Lock()
+        self._save_event = threading.Event()
+        self._save_idle = threading.Event()  # 没有待写入或正在写入的快照时置位
+        self._save_idle.set()
+        self._last_saved_signature = None  # 上次成功写入的 (路径, 映射目录, 内容哈希)，仅保存线程访问
+        threading.Thread(target=self._saver_loop, daemon=True).start()
+        
+        # 常驻翻译工作线程：翻译任务以闭包形式投递，按提交顺序依次执行，避免每次新建线程
+        self._work_q = queue.Queue()
+        threading.Thread(target=self._translate_dispatcher, daemon=True).start()
+        
         # 界面变量
         self.translation_mode = tk.StringVar(value="快速模式")
         self.is_translating = False
         
+        # 线程→界面更新队列：工作线程只投递，由主线程周期性批量消费
+        self._ui_queue = queue.Queue(maxsize=64)
+        
         self.setup_ui()
         self.setup_bindings()
         
+        # 启动界面队列消费者
+        self.root.after(50, self._drain_ui_queue)
+        
     def setup_ui(self):
         """设置主界面"""
         # 创建主框架
@@ -212,12 +258,12 @@ class MainWindow:
         if not item:
             return
         
-        # 获取单元格的值和位置
-        values = self.translation_table.item(item)['values']
-        if not values or column_index >= len(values):
+        # 获取单元格的值（读行数据缓存）和位置
+        row_index = self.translation_table.index(item)
+        if row_index >= len(self._src_col):
             return
         
-        cell_value = values[column_index]
+        cell_value = self._src_col[row_index] if column_index == 1 else self._tgt_col[row_index]
         
         # 获取单元格的边界框
         bbox = self.translation_table.bbox(item, column)
@@ -259,11 +305,15 @@ class MainWindow:
         # 获取新值
         new_value = self.edit_entry.get()
         
-        # 更新表格
-        values = list(self.translation_table.item(self.editing_item)['values'])
-        old_value = values[self.editing_column]
-        values[self.editing_column] = new_value
-        self.translation_table.item(self.editing_item, values=values)
+        # 更新表格与行数据缓存：只写被编辑的单元格；译文统一经 _set_target_text 写入
+        row_index = self.translation_table.index(self.editing_item)
+        if self.editing_column == 1:
+            changed = self._src_col[row_index] != new_value
+            self.translation_table.set(self.editing_item, 'source_text', new_value)
+            self._src_col[row_index] = new_value
+            self._update_empty_row(row_index)
+        else:
+            changed = self._set_target_text(self.editing_item, row_index, new_value)
         
         # 销毁编辑控件
         self.edit_entry.destroy()
@@ -272,7 +322,7 @@ class MainWindow:
         self.editing_column = None
         
         # 只有当内容真正改变时才触发保存
-        if old_value != new_value:
+        if changed:
             # 触发保存（包含时间戳更新）
             self._schedule_save_to_target()
     
@@ -296,6 +346,7 @@ class MainWindow:
         # 清空现有数据
         for item in self.translation_table.get_children():
             self.translation_table.delete(item)
+        self._row_items = []
         
         # 过滤空行，确保数据一致性
         # 移除source_lines末尾的空行
@@ -318,34 +369,83 @@ class MainWindow:
         if len(target_lines) > len(source_lines):
             target_lines = target_lines[:len(source_lines)]
         
+        # 重建行数据缓存
+        self._src_col = list(source_lines)
+        self._tgt_col = list(target_lines)
+        self._empty_target_rows = {
+            i for i, (source, target) in enumerate(zip(self._src_col, self._tgt_col))
+            if source.strip() and not target.strip()
+        }
+        self._translated_count = sum(1 for target in self._tgt_col if target.strip())
+        
         # 插入数据到表格（行号从1开始）
         for i, source in enumerate(source_lines):
             line_num = i + 1  # 行号从1开始，与line_number保持一致
             target = target_lines[i] if i < len(target_lines) else ""
             
-            self.translation_table.insert(
+            self._row_items.append(self.translation_table.insert(
                 '',
                 'end',
                 values=(line_num, source, target),
                 tags=('evenrow' if i % 2 == 0 else 'oddrow',)
-            )
+            ))
         
         # 设置交替行颜色
         self.translation_table.tag_configure('evenrow', background='#f9f9f9')
         self.translation_table.tag_configure('oddrow', background='white')
     
     def get_table_data(self):
-        """从表格获取所有数据"""
-        source_lines = []
-        target_lines = []
+        """获取所有数据（直接返回行数据缓存，不经过Treeview）
         
-        for item in self.translation_table.get_children():
-            values = self.translation_table.item(item)['values']
-            if values:
-                source_lines.append(values[1])
-                target_lines.append(values[2] if len(values) > 2 else "")
+        注意：返回的是内部缓存列表本身，调用方只读、不得修改
+        """
+        return self._src_col, self._tgt_col
         
-        return source_lines, target_lines
+    def _set_target_text(self, item, row_index, text):
+        """写入单个译文单元格：先与缓存比对，仅在变化时写入Treeview
+        
+        返回是否发生了实际写入，调用方据此跳过无变化时的滚动与保存
+        """
+        old_text = self._tgt_col[row_index]
+        if old_text == text:
+            return False
+        self._tgt_col[row_index] = text
+        self._translated_count += bool(text.strip()) - bool(old_text.strip())
+        self.translation_table.set(item, 'target_text', text)
+        if text.strip():
+            self._empty_target_rows.discard(row_index)
+        elif self._src_col[row_index].strip():
+            self._empty_target_rows.add(row_index)
+        return True
+    
+    def _split_streaming_lines(self, text):
+        """把流式文本拆成行：去掉开头的空行，连续空行（含仅空白的行）只保留一个
+        
+        由正则一次折叠，避免逐行的Python循环；结尾的空行同样只保留一个
+        """
+        text = text.lstrip()
+        if not text:
+            return []
+        lines = self._collapse_blank_re.sub('\n\n', text).split('\n')
+        # 结尾为空行时正则之后会留下 '' 加一个空白尾项，去掉多出的这一项
+        if len(lines) > 2 and not lines[-2] and not lines[-1].strip():
+            lines.pop()
+        return lines
+    
+    def _scroll_to_item(self, item, force=False):
+        """滚动表格使指定行可见；非强制调用每100ms最多执行一次，避免流式更新时反复滚动"""
+        now = time.monotonic()
+        if not force and now - self._last_see_time < 0.1:
+            return
+        self._last_see_time = now
+        self.translation_table.see(item)
+    
+    def _update_empty_row(self, row_index):
+        """按缓存重新判定单行是否待翻译（用于原文改动；译文写入由 _set_target_text 维护）"""
+        if self._src_col[row_index].strip() and not self._tgt_col[row_index].strip():
+            self._empty_target_rows.add(row_index)
+        else:
+            self._empty_target_rows.discard(row_index)
         
     def refresh_table_display(self):
         """刷新表格显示（在数据更新后调用）"""
@@ -370,17 +470,16 @@ class MainWindow:
         
     def update_table_row(self, line_number, source_text=None, target_text=None):
         """更新表格中指定行的数据"""
-        items = self.translation_table.get_children()
+        items = self._row_items
         if line_number - 1 < len(items):
             item = items[line_number - 1]
-            values = list(self.translation_table.item(item)['values'])
             
             if source_text is not None:
-                values[1] = source_text
+                self.translation_table.set(item, 'source_text', source_text)
+                self._src_col[line_number - 1] = source_text
+                self._update_empty_row(line_number - 1)
             if target_text is not None:
-                values[2] = target_text
-            
-            self.translation_table.item(item, values=values)
+                self._set_target_text(item, line_number - 1, target_text)
 
         
     def create_control_panel(self, parent):
@@ -650,7 +749,7 @@ class MainWindow:
         
         # 特别处理翻译控制按钮
         try:
-            if hasattr(self, 'is_translating') and self.is_translating:
+            if self.is_translating:
                 self.translate_btn.config(state=tk.DISABLED)
                 self.continue_btn.config(state=tk.DISABLED)
             else:
@@ -711,19 +810,15 @@ class MainWindow:
         self._continue_start_line = 0
         
         # 清空译文列
-        for item in self.translation_table.get_children():
-            values = list(self.translation_table.item(item)['values'])
-            values[2] = ""  # 清空译文
-            self.translation_table.item(item, values=values)
+        self._tgt_col = [""] * len(self._src_col)
+        self._empty_target_rows = {i for i, source in enumerate(self._src_col) if source.strip()}
+        self._translated_count = 0
+        for item in self._row_items:
+            self.translation_table.set(item, 'target_text', "")  # 清空译文
         
-        # 在新线程中执行翻译
+        # 交给翻译工作线程执行
         source_content = "\n".join(source_lines)
-        translation_thread = threading.Thread(
-            target=self._translate_worker,
-            args=(source_content, self.translation_mode.get())
-        )
-        translation_thread.daemon = True
-        translation_thread.start()
+        self._submit_translation(self._translate_worker, source_content)
 
     def continue_translation(self):
         """继续翻译（修复：智能检查空译文行，确保完整翻译）
@@ -734,29 +829,17 @@ class MainWindow:
         3. 只有当所有原文行都有对应的非空译文时，才提示翻译完成
         4. 不清除任何已有的译文，保持已翻译内容不变
         """
-        # 获取原文和译文
-        source_lines, target_lines = self.get_table_data()
-
-        # ✅ 新逻辑：检查所有行，找出需要翻译的行
-        need_translation_indices = []
-        for i in range(len(source_lines)):
-            source_text = source_lines[i].strip() if i < len(source_lines) else ""
-            target_text = target_lines[i].strip() if i < len(target_lines) else ""
-            
-            # 如果原文不为空但译文为空，则需要翻译
-            if source_text and not target_text:
-                need_translation_indices.append(i)
-        
+        # ✅ 新逻辑：需要翻译的行（原文不为空但译文为空）由待翻译行集合增量维护
         # 如果没有需要翻译的行，说明全部翻译完成
-        if not need_translation_indices:
+        if not self._empty_target_rows:
             messagebox.showinfo("提示", "所有内容已翻译完成。")
             return
         
         # ✅ 找到第一个需要翻译的行作为起始位置
-        start_idx = need_translation_indices[0]
+        start_idx = min(self._empty_target_rows)
         
         # 取剩余原文（从第一个需要翻译的行开始）
-        remaining_lines = source_lines[start_idx:] if start_idx < len(source_lines) else []
+        remaining_lines = self._src_col[start_idx:]
         remaining_content = '\n'.join(remaining_lines).strip()
 
         if not remaining_content:
@@ -777,13 +860,8 @@ class MainWindow:
         # 记录续译起始行（用于回调中计算绝对位置）
         self._continue_start_line = start_idx
 
-        # 在新线程中执行翻译，对剩余内容进行
-        translation_thread = threading.Thread(
-            target=self._translate_worker,
-            args=(remaining_content, self.translation_mode.get())
-        )
-        translation_thread.daemon = True
-        translation_thread.start()
+        # 交给翻译工作线程执行，对剩余内容进行
+        self._submit_translation(self._translate_worker, remaining_content)
     
     def show_context_menu(self, event):
         """显示右键菜单
@@ -830,15 +908,13 @@ class MainWindow:
         # 提取选中行的原文和位置信息
         selected_data = []
         for item in selection:
-            values = self.translation_table.item(item)['values']
-            if values:
-                line_num = values[0]  # 行号
-                source_text = values[1]  # 原文
-                selected_data.append({
-                    'item': item,
-                    'line_num': line_num,
-                    'source_text': source_text
-                })
+            row_index = self.translation_table.index(item)
+            selected_data.append({
+                'item': item,
+                'row': row_index,  # 表格行索引（0-based）
+                'line_num': row_index + 1,  # 行号
+                'source_text': self._src_col[row_index]  # 原文
+            })
         
         if not selected_data:
             messagebox.showwarning("翻译警告", "选中的行没有内容")
@@ -857,16 +933,25 @@ class MainWindow:
         # 记录选中的数据，用于回调中写回结果
         self._selected_translation_data = selected_data
         
-        # 在新线程中执行翻译
-        translation_thread = threading.Thread(
-            target=self._translate_selected_worker,
-            args=(combined_source, self.translation_mode.get())
-        )
-        translation_thread.daemon = True
-        translation_thread.start()
+        # 交给翻译工作线程执行
+        self._submit_translation(self._translate_selected_worker, combined_source)
         
         self.update_status(f"正在翻译选中的 {len(selected_data)} 行...")
     
+    def _submit_translation(self, worker, content):
+        """向常驻工作线程投递一次翻译任务（翻译模式在界面线程读取）"""
+        mode = self.translation_mode.get()
+        self._work_q.put(lambda: worker(content, mode))
+    
+    def _translate_dispatcher(self):
+        """常驻工作线程主循环：依次执行投递的翻译任务"""
+        while True:
+            job = self._work_q.get()
+            try:
+                job()
+            except Exception as e:
+                print(f"翻译任务执行失败: {e}")
+    
     def _translate_selected_worker(self, content, mode):
         """翻译选中行的工作线程"""
         try:
@@ -877,7 +962,8 @@ class MainWindow:
                 self._on_selected_translation_complete
             )
         except Exception as e:
-            self.root.after(0, lambda: self._on_translation_error(str(e)))
+            error_msg = str(e)
+            self._post_ui('complete', None, lambda: self._on_translation_error(error_msg))
     
     def _on_selected_translation_progress(self, progress, batch_data):
         """选中行翻译进度回调"""
@@ -891,7 +977,7 @@ class MainWindow:
                 return
             
             # 获取选中的数据
-            selected_data = getattr(self, '_selected_translation_data', [])
+            selected_data = self._selected_translation_data
             if not selected_data:
                 return
             
@@ -904,48 +990,39 @@ class MainWindow:
                 expected_lines = batch_data.get('expected_lines', 1)
                 
                 # ✅ 彻底过滤空行：将连续的多个空行合并为一个，避免大量空行堆积
-                all_lines = current_text.split('\n')
-                streaming_lines = []
-                prev_empty = False
-                for line in all_lines:
-                    if line.strip():  # 有内容的行
-                        streaming_lines.append(line)
-                        prev_empty = False
-                    else:  # 空行
-                        # 只在前一行不是空行时才保留一个空行
-                        if not prev_empty and streaming_lines:  # 且不是第一行
-                            streaming_lines.append('')
-                            prev_empty = True
-                        # 否则跳过这个空行
+                streaming_lines = self._split_streaming_lines(current_text)
                 
                 # 实时显示：不超过预期行数
+                last_item = None
                 for i, line in enumerate(streaming_lines[:expected_lines]):
                     row_index = batch_start + i
                     if row_index < len(selected_data):
                         item = selected_data[row_index]['item']
-                        values = list(self.translation_table.item(item)['values'])
-                        values[2] = line.strip()  # 实时更新译文栏
-                        self.translation_table.item(item, values=values)
-                        
-                        # 滚动到当前行
-                        self.translation_table.see(item)
+                        # 实时更新译文栏（内容未变化时不写入也不滚动）
+                        if self._set_target_text(item, selected_data[row_index]['row'], line.strip()):
+                            last_item = item
+                
+                # 循环结束后只滚动一次，到最后写入的行
+                if last_item:
+                    self._scroll_to_item(last_item)
             else:
                 # 批次完成模式：写入最终结果
                 translated_lines = batch_data.get('translated_lines', [])
                 
                 # 将翻译结果写回对应的行
+                changed = False
                 for i, translated_line in enumerate(translated_lines):
                     row_index = batch_start + i
                     if row_index < len(selected_data):
                         item = selected_data[row_index]['item']
-                        values = list(self.translation_table.item(item)['values'])
-                        values[2] = translated_line.strip()  # 更新译文
-                        self.translation_table.item(item, values=values)
+                        # 更新译文
+                        changed |= self._set_target_text(item, selected_data[row_index]['row'], translated_line.strip())
                 
-                # 触发保存
-                self._schedule_save_to_target()
+                # 触发保存（译文无变化时跳过）
+                if changed:
+                    self._schedule_save_to_target()
         
-        self.root.after(0, update_ui)
+        self._post_progress('selected', batch_data, update_ui)
     
     def _on_selected_translation_complete(self):
         """选中行翻译完成回调"""
@@ -960,11 +1037,10 @@ class MainWindow:
             self.progress_var.set(100)
             
             # 获取翻译的行数
-            selected_count = len(getattr(self, '_selected_translation_data', []))
+            selected_count = len(self._selected_translation_data)
             
             # 清理临时数据
-            if hasattr(self, '_selected_translation_data'):
-                delattr(self, '_selected_translation_data')
+            self._selected_translation_data = []
             
             # 立即保存
             self._schedule_save_to_target(delay_ms=0)
@@ -972,12 +1048,12 @@ class MainWindow:
             self.update_status(f"选中的 {selected_count} 行翻译完成")
             messagebox.showinfo("翻译完成", f"已完成 {selected_count} 行的翻译")
         
-        self.root.after(0, complete_ui)
+        self._post_ui('complete', None, complete_ui)
     
     def _translate_worker(self, content, mode):
         """翻译工作线程"""
         try:
-            self.update_status("正在翻译...")
+            self._post_ui('batch', None, lambda: self.update_status("正在翻译..."))
             
             if mode == "逐行模式":
                 self.translator.translate_line_by_line(
@@ -993,7 +1069,8 @@ class MainWindow:
                 )
                 
         except Exception as e:
-            self.root.after(0, lambda: self._on_translation_error(str(e)))
+            error_msg = str(e)
+            self._post_ui('complete', None, lambda: self._on_translation_error(error_msg))
             
     def _on_translation_progress(self, progress, batch_data):
         """翻译进度回调（修复：确保进度条持续可见，避免多余空行）
@@ -1026,13 +1103,13 @@ class MainWindow:
             batch_start = batch_data.get('batch_start', 0)
             is_streaming = batch_data.get('streaming', False)
             
-            # 获取所有表格项
-            items = self.translation_table.get_children()
+            # 获取所有表格项（缓存的项ID列表）
+            items = self._row_items
             if not items:
                 return
             
             # 计算绝对位置：如果是续翻，需要加上续翻起始偏移
-            continue_offset = getattr(self, '_continue_start_line', 0)
+            continue_offset = self._continue_start_line
             absolute_start = continue_offset + batch_start
             
             if is_streaming:
@@ -1041,45 +1118,42 @@ class MainWindow:
                 expected_lines = batch_data.get('expected_lines', 1)
                 
                 # ✅ 修复2：过滤空行，避免多余空行
-                # 将当前文本按换行符拆分（仅用于实时显示）
-                streaming_lines = [line for line in current_text.split('\n') if line.strip()]
+                # 将当前文本按换行符拆分（仅用于实时显示），每行只strip一次
+                streaming_lines = [text for text in (line.strip() for line in current_text.split('\n')) if text]
                 
                 # 实时显示：不超过预期行数
+                changed = False
                 for i, line in enumerate(streaming_lines[:expected_lines]):
                     row_index = absolute_start + i
                     if row_index < len(items):
-                        item = items[row_index]
-                        values = list(self.translation_table.item(item)['values'])
-                        values[2] = line.strip()  # 实时更新译文栏
-                        self.translation_table.item(item, values=values)
+                        changed |= self._set_target_text(items[row_index], row_index, line)  # 实时更新译文栏
                 
-                # 滚动到最后更新的行
+                # 滚动到最后更新的行（本次无变化时不滚动）
                 last_row = absolute_start + min(len(streaming_lines), expected_lines) - 1
-                if 0 <= last_row < len(items):
-                    self.translation_table.see(items[last_row])
+                if changed and 0 <= last_row < len(items):
+                    self._scroll_to_item(items[last_row])
                     
             else:
                 # 批次完成模式：写入最终结果
                 translated_lines = batch_data.get('translated_lines', [])
                 
                 # ✅ 关键：严格按行号写入译文
+                changed = False
                 for i, translated_line in enumerate(translated_lines):
                     row_index = absolute_start + i
                     if row_index < len(items):
-                        item = items[row_index]
-                        values = list(self.translation_table.item(item)['values'])
-                        values[2] = translated_line.strip()
-                        self.translation_table.item(item, values=values)
+                        changed |= self._set_target_text(items[row_index], row_index, translated_line.strip())
                 
                 # 滚动到最后更新的行
                 last_row = absolute_start + len(translated_lines) - 1
                 if 0 <= last_row < len(items):
-                    self.translation_table.see(items[last_row])
+                    self._scroll_to_item(items[last_row], force=True)
                 
-                # 实时保存（防抖）
-                self._schedule_save_to_target()
+                # 实时保存（防抖；译文无变化时跳过）
+                if changed:
+                    self._schedule_save_to_target()
                     
-        self.root.after(0, update_ui)
+        self._post_progress('normal', batch_data, update_ui)
         
     def _on_translation_complete(self):
         """翻译完成回调（新增：自动翻译查漏机制）"""
@@ -1090,6 +1164,8 @@ class MainWindow:
             self.stop_btn.config(state=tk.DISABLED)
             self.progress_var.set(100)
             self.update_status("翻译完成")
+            # 翻译结束，立即落盘
+            self._schedule_save_to_target(delay_ms=0)
             # 复位续写标记
             self._continuing_mode = False
             self._continuing_first_insert = False
@@ -1097,7 +1173,7 @@ class MainWindow:
             # ✅ 新增：启动翻译查漏机制
             self.root.after(500, self._start_missing_translation_check)
             
-        self.root.after(0, update_ui)
+        self._post_ui('complete', None, update_ui)
         
     def _on_translation_error(self, error_msg):
         """翻译错误回调"""
@@ -1130,17 +1206,10 @@ class MainWindow:
             self.stop_btn.config(state=tk.DISABLED)
             self.update_status("翻译已停止，已翻译内容已保留")
             
-            # 重置进度条为当前实际进度
-            items = self.translation_table.get_children()
-            if items:
-                # 计算实际翻译进度
-                total = len(items)
-                translated = 0
-                for item in items:
-                    values = self.translation_table.item(item)['values']
-                    if len(values) > 2 and values[2].strip():  # 译文不为空
-                        translated += 1
-                actual_progress = (translated / total) * 100 if total > 0 else 0
+            # 重置进度条为当前实际进度（已翻译行数随写入增量维护）
+            total = len(self._row_items)
+            if total:
+                actual_progress = (self._translated_count / total) * 100
                 self.progress_var.set(actual_progress)
             
             # ✅ 关键：立即触发保存（保存当前已翻译部分）
@@ -1173,9 +1242,9 @@ class MainWindow:
                 # 若存在EPUB映射，则同步更新映射键值对
                 if self.current_mapping_dir and self.current_mapping_keys:
                     try:
+                        self.flush_saves()
                         self.epub_processor.save_translations(
                             str(self.current_mapping_dir), 
-                            self.current_mapping_keys, 
                             target_lines
                         )
                     except Exception as e:
@@ -1188,10 +1257,8 @@ class MainWindow:
         """导出对照文件"""
         try:
             source_lines, target_lines = self.get_table_data()
-            source_content = "\n".join(source_lines)
-            target_content = "\n".join(target_lines)
             
-            if not source_content or not target_content:
+            if not any(source_lines) or not any(target_lines):
                 messagebox.showwarning("导出警告", "原文或译文为空")
                 return
                 
@@ -1202,8 +1269,9 @@ class MainWindow:
             )
             
             if file_path:
+                # 直接传入表格列，省去拼接后再拆分
                 comparison_content = self.file_handler.create_comparison_file(
-                    source_content, target_content
+                    source_lines, target_lines
                 )
                 self.file_handler.save_file(file_path, comparison_content)
                 self.update_status(f"对照文件已导出: {Path(file_path).name}")
@@ -1218,7 +1286,8 @@ class MainWindow:
                 messagebox.showwarning("导出警告", "当前会话并非EPUB映射，无法导出EPUB")
                 return
             
-            # 先同步一次映射（使用当前表格内容）
+            # 先等后台保存线程写完，再同步一次映射（使用当前表格内容），避免与其并发写映射
+            self.flush_saves()
             _, target_lines = self.get_table_data()
             
             try:
@@ -1308,55 +1377,156 @@ class MainWindow:
         """更新状态栏"""
         self.status_label.config(text=message)
 
+    # 线程→界面：有界队列 + 主线程单一周期性消费者
+    def _post_ui(self, kind, key, func):
+        """从工作线程投递一次界面更新
+        
+        kind: 'stream'（流式片段，可丢弃）| 'batch'（批次结果）| 'complete'（完成/错误）
+        队列已满时直接丢弃流式片段（后续片段会携带更完整的文本）；
+        批次结果与完成回调阻塞等待，保证不丢失。
+        在主线程调用时不能阻塞等待（队列只由主线程消费，会死锁），
+        队列已满则先就地处理已排队的更新再投递，保持更新顺序不变。
+        """
+        if kind == 'stream':
+            try:
+                self._ui_queue.put_nowait((kind, key, func))
+            except queue.Full:
+                pass
+        elif threading.current_thread() is threading.main_thread():
+            while True:
+                try:
+                    self._ui_queue.put_nowait((kind, key, func))
+                    return
+                except queue.Full:
+                    self._process_ui_queue()
+        else:
+            self._ui_queue.put((kind, key, func))
+
+    def _post_progress(self, source, batch_data, func):
+        """投递进度回调：流式片段按 (来源, batch_start) 去重"""
+        if isinstance(batch_data, dict) and batch_data.get('streaming', False):
+            self._post_ui('stream', (source, batch_data.get('batch_start', 0)), func)
+        else:
+            self._post_ui('batch', None, func)
+
+    def _drain_ui_queue(self, max_count=8):
+        """主线程定时消费界面队列"""
+        self._process_ui_queue(max_count)
+        self.root.after(50, self._drain_ui_queue)
+
+    def _process_ui_queue(self, max_count=8):
+        """（主线程）处理界面队列：每次最多处理max_count项，同一批次的流式片段只应用最后一个"""
+        pending = []
+        try:
+            while len(pending) < max_count:
+                pending.append(self._ui_queue.get_nowait())
+        except queue.Empty:
+            pass
+        
+        # 记录每个流式键最后出现的位置，较早的片段已被覆盖，直接跳过
+        last_stream = {}
+        for idx, (kind, key, _) in enumerate(pending):
+            if kind == 'stream':
+                last_stream[key] = idx
+        
+        for idx, (kind, key, func) in enumerate(pending):
+            if kind == 'stream' and last_stream[key] != idx:
+                continue
+            try:
+                func()
+            except Exception as e:
+                print(f"界面更新失败: {e}")
+
     # 实时保存：防抖调度 + 原子写入到当前译文文件
-    def _schedule_save_to_target(self, delay_ms: int = 400):
+    def _schedule_save_to_target(self, delay_ms: int = None):
         """为译文内容变更安排一次防抖保存
         
         ✅ 修复：当禁用自动保存时，不执行保存操作
+        未指定delay_ms时：翻译进行中使用2000ms的长防抖窗口，否则400ms；
+        翻译完成/停止时由调用方传入0立即落盘
         """
         # ✅ 关键修复：检查是否禁用了自动保存
-        if getattr(self, '_disable_auto_save', False):
+        if self._disable_auto_save:
             return
         
         # 若无当前译文文件路径，跳过
-        if not getattr(self, 'current_target_path', None):
+        if self.current_target_path is None:
             return
+        if delay_ms is None:
+            delay_ms = 2000 if self.is_translating else 400
         # 使用统一防抖器，避免频繁IO
         self._debounce('save_tgt', delay_ms, self._atomic_save_target)
 
     def _atomic_save_target(self):
-        """将译文框内容原子性写入当前译文文件。
+        """将译文快照投递给保存线程，由其原子性写入当前译文文件。
         
         完全重构：简化为纯行号对齐机制
         - 严格按行号对齐（从1开始）
         - 自动更新translated_at时间戳
         - 保证未翻译行的translated_text为空字符串
         """
+        tgt_path = self.current_target_path
+        if not tgt_path:
+            return
+        
+        # 在界面线程直接从译文缓存取快照（严格按行号顺序），IO交给保存线程
+        content = "\n".join(self._tgt_col)
+        mapping_dir = str(self.current_mapping_dir) if self.current_mapping_dir else None
+        # EPUB映射同步需要逐行列表：复制一份，避免保存线程读取时界面线程继续写入
+        target_lines = list(self._tgt_col) if mapping_dir else None
+        with self._save_lock:
+            self._save_slot = (tgt_path, content, target_lines, mapping_dir)
+            self._save_idle.clear()
+        self._save_event.set()
+
+    def flush_saves(self, timeout: float = 10.0) -> bool:
+        """立即保存当前译文并等待保存线程写完（导出、关闭窗口前调用）
+        
+        取消尚未触发的防抖保存，直接投递当前快照；返回是否在超时前全部写完
+        """
+        job = self._debouncers.pop('save_tgt', None)
+        if job is not None:
+            try:
+                self.root.after_cancel(job)
+            except Exception:
+                pass
+        if not self._disable_auto_save:
+            self._atomic_save_target()
+        return self._save_idle.wait(timeout)
+
+    def _saver_loop(self):
+        """保存线程主循环：等待新快照并写盘，积压的多次保存只写最后一次"""
+        while True:
+            self._save_event.wait()
+            self._save_event.clear()
+            with self._save_lock:
+                slot, self._save_slot = self._save_slot, None
+            if slot is not None:
+                self._write_target_snapshot(*slot)
+            with self._save_lock:
+                if self._save_slot is None:
+                    self._save_idle.set()
+
+    def _write_target_snapshot(self, tgt_path, content, target_lines, mapping_dir):
+        """（保存线程）写入译文文件并同步EPUB映射；内容与上次写入相同时直接跳过"""
+        signature = (str(tgt_path), mapping_dir, hash(content))
+        if signature == self._last_saved_signature:
+            return
         try:
-            tgt_path = getattr(self, 'current_target_path', None)
-            if not tgt_path:
-                return
-            
-            # 从表格获取译文（严格按行号顺序）
-            _, target_lines = self.get_table_data()
-            content = "\n".join(target_lines)
-            
-            # 临时文件与原子替换
-            tmp_path = tgt_path.with_suffix(tgt_path.suffix + '.tmp')
-            # 先写临时文件
-            self.file_handler.write_file(str(tmp_path), content)
-            # 原子替换目标文件
-            os.replace(str(tmp_path), str(tgt_path))
+            # 一次编码后原子写入，并fsync确保落盘
+            atomic_write(tgt_path, content.encode('utf-8'), fsync=True)
+            self._last_saved_signature = signature
             
             # 同步EPUB映射（若存在）：按line_number严格对齐并更新时间戳
-            if self.current_mapping_dir:
+            if mapping_dir:
                 try:
                     self.epub_processor.save_translations(
-                        str(self.current_mapping_dir), 
+                        mapping_dir, 
                         target_lines
                     )
                 except Exception as e:
-                    # 记录错误但不中断保存
+                    # 记录错误但不中断保存；清除签名以便下次重试同步
+                    self._last_saved_signature = None
                     print(f"同步EPUB映射失败: {e}")
         except Exception as e:
             # 静默容错，不打断用户操作
@@ -1365,8 +1535,6 @@ class MainWindow:
     # Step6: 软换行与窗口变化重对齐 + 防抖
     def _debounce(self, key, delay_ms, func):
         """简单防抖：避免高频事件导致卡顿"""
-        if not hasattr(self, '_debouncers'):
-            self._debouncers = {}
         # 取消已有的延迟任务
         if key in self._debouncers:
             try:
@@ -1391,37 +1559,32 @@ class MainWindow:
         if self.is_translating:
             return
         
-        # 获取原文和译文
-        source_lines, target_lines = self.get_table_data()
-        
-        # 查找空行（原文不为空但译文为空）
-        empty_indices = []
-        for i in range(len(source_lines)):
-            if source_lines[i].strip() and (i >= len(target_lines) or not target_lines[i].strip()):
-                empty_indices.append(i)
+        # 空行集合随写入增量维护（原文不为空但译文为空）
+        empty_rows = self._empty_target_rows
         
         # 如果没有空行，正常结束
-        if not empty_indices:
+        if not empty_rows:
             self.update_status("翻译完成，无需查漏")
             messagebox.showinfo("翻译完成", "所有内容已翻译完成！")
             return
         
         # 有空行，开始翻译查漏
-        total_empty = len(empty_indices)
+        total_empty = len(empty_rows)
         self.update_status(f"正在进行翻译查漏：发现 {total_empty} 个空行")
         
         # 一次最多翻译20个空行
         batch_size = 20
-        current_batch_indices = empty_indices[:batch_size]
+        current_batch_indices = heapq.nsmallest(batch_size, empty_rows)
         
         # 提取这些空行的原文
-        empty_source_lines = [source_lines[i] for i in current_batch_indices]
+        empty_source_lines = [self._src_col[i] for i in current_batch_indices]
         
         # 记录空行位置
         self._missing_translation_indices = current_batch_indices
         
-        # 标记为翻译查漏模式
+        # 标记为翻译查漏模式，并记录本轮开始前的空行集合
         self._is_missing_check = True
+        self._last_missing_set = frozenset(empty_rows)
         
         # 开始翻译
         self.is_translating = True
@@ -1429,14 +1592,9 @@ class MainWindow:
         self.continue_btn.config(state=tk.DISABLED)
         self.stop_btn.config(state=tk.NORMAL)
         
-        # 在新线程中执行翻译
+        # 交给翻译工作线程执行
         combined_source = '\n'.join(empty_source_lines)
-        translation_thread = threading.Thread(
-            target=self._translate_missing_worker,
-            args=(combined_source, self.translation_mode.get())
-        )
-        translation_thread.daemon = True
-        translation_thread.start()
+        self._submit_translation(self._translate_missing_worker, combined_source)
     
     def _translate_missing_worker(self, content, mode):
         """翻译查漏工作线程"""
@@ -1447,7 +1605,8 @@ class MainWindow:
                 self._on_missing_translation_complete
             )
         except Exception as e:
-            self.root.after(0, lambda: self._on_translation_error(str(e)))
+            error_msg = str(e)
+            self._post_ui('complete', None, lambda: self._on_translation_error(error_msg))
     
     def _on_missing_translation_progress(self, progress, batch_data):
         """翻译查漏进度回调"""
@@ -1461,48 +1620,49 @@ class MainWindow:
                 return
             
             # 获取空行位置
-            missing_indices = getattr(self, '_missing_translation_indices', [])
+            missing_indices = self._missing_translation_indices
             if not missing_indices:
                 return
             
             batch_start = batch_data.get('batch_start', 0)
             is_streaming = batch_data.get('streaming', False)
-            items = self.translation_table.get_children()
+            items = self._row_items
             
             if is_streaming:
                 # 流式输出模式
                 current_text = batch_data.get('current_text', '')
                 expected_lines = batch_data.get('expected_lines', 1)
-                streaming_lines = [line for line in current_text.split('\n') if line.strip()]
+                streaming_lines = [text for text in (line.strip() for line in current_text.split('\n')) if text]
                 
+                last_item = None
                 for i, line in enumerate(streaming_lines[:expected_lines]):
                     relative_index = batch_start + i
                     if relative_index < len(missing_indices):
                         row_index = missing_indices[relative_index]
                         if row_index < len(items):
                             item = items[row_index]
-                            values = list(self.translation_table.item(item)['values'])
-                            values[2] = line.strip()
-                            self.translation_table.item(item, values=values)
-                            self.translation_table.see(item)
+                            if self._set_target_text(item, row_index, line):
+                                last_item = item
+                
+                if last_item:
+                    self._scroll_to_item(last_item)
             else:
                 # 批次完成模式
                 translated_lines = batch_data.get('translated_lines', [])
                 
+                changed = False
                 for i, translated_line in enumerate(translated_lines):
                     relative_index = batch_start + i
                     if relative_index < len(missing_indices):
                         row_index = missing_indices[relative_index]
                         if row_index < len(items):
-                            item = items[row_index]
-                            values = list(self.translation_table.item(item)['values'])
-                            values[2] = translated_line.strip()
-                            self.translation_table.item(item, values=values)
+                            changed |= self._set_target_text(items[row_index], row_index, translated_line.strip())
                 
-                # 保存
-                self._schedule_save_to_target()
+                # 保存（译文无变化时跳过）
+                if changed:
+                    self._schedule_save_to_target()
         
-        self.root.after(0, update_ui)
+        self._post_progress('missing', batch_data, update_ui)
     
     def _on_missing_translation_complete(self):
         """翻译查漏完成回调：继续检查是否还有空行"""
@@ -1513,15 +1673,24 @@ class MainWindow:
             self.stop_btn.config(state=tk.DISABLED)
             
             # 清理临时数据
-            if hasattr(self, '_missing_translation_indices'):
-                delattr(self, '_missing_translation_indices')
-            if hasattr(self, '_is_missing_check'):
-                delattr(self, '_is_missing_check')
+            self._missing_translation_indices = []
+            self._is_missing_check = False
             
             # 立即保存
             self._schedule_save_to_target(delay_ms=0)
             
+            # 本轮未填补任何空行时停止重试，避免无限循环消耗API调用
+            remaining = frozenset(self._empty_target_rows)
+            if remaining and remaining == self._last_missing_set:
+                self.update_status(f"翻译查漏未完成：仍有 {len(remaining)} 个空行")
+                messagebox.showwarning(
+                    "查漏未完成",
+                    f"本轮查漏未能补全任何空行，已停止自动重试。\n"
+                    f"仍有 {len(remaining)} 个空行，可选中对应行手动翻译。"
+                )
+                return
+            
             # 继续检查是否还有空行（循环执行）
             self.root.after(1000, self._start_missing_translation_check)
         
-        self.root.after(0, update_ui)
\ No newline at end of file
+        self._post_ui('complete', None, update_ui)
\ No newline at end of file
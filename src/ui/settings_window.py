@@ -7,6 +7,40 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 import threading
+from types import MappingProxyType
+
+# 模型名称映射：完整名称 -> 显示名称（只读常量，模块加载时构建一次）
+_MODEL_DISPLAY_MAP = MappingProxyType({
+    # SiliconFlow 模型
+    "deepseek-ai/DeepSeek-V3.2-Exp": "DeepSeek V3.2 Exp",
+    "deepseek-ai/DeepSeek-V3.1-Terminus": "DeepSeek V3.1",
+    "deepseek-ai/DeepSeek-V3": "DeepSeek V3",
+    "moonshotai/Kimi-K2-Instruct-0905": "Kimi K2",
+    "Qwen/Qwen3-Next-80B-A3B-Instruct": "Qwen3 Next 80B",
+    # Deepseek 官方模型
+    "deepseek-chat": "DeepSeek Chat",
+    "deepseek-reasoner": "DeepSeek Reasoner",
+    # 保持向后兼容
+    "qwen-turbo": "Qwen Turbo",
+    "glm-4-flash": "GLM-4 Flash"
+})
+
+# 反向映射：显示名称 -> 完整名称
+_DISPLAY_TO_MODEL = MappingProxyType({v: k for k, v in _MODEL_DISPLAY_MAP.items()})
+
+# 各提供商可选模型（显示名称）
+_SILICONFLOW_MODELS = (
+    "DeepSeek V3.2 Exp",
+    "DeepSeek V3.1",
+    "DeepSeek V3",
+    "Kimi K2",
+    "Qwen3 Next 80B"
+)
+
+_DEEPSEEK_MODELS = (
+    "DeepSeek Chat",
+    "DeepSeek Reasoner"
+)
 
 class SettingsWindow:
     def __init__(self, parent, config_manager, callback=None):
@@ -14,24 +48,13 @@ class SettingsWindow:
         self.config_manager = config_manager
         self.callback = callback
         
-        # 模型名称映射：完整名称 -> 显示名称
-        self.model_display_map = {
-            # SiliconFlow 模型
-            "deepseek-ai/DeepSeek-V3.2-Exp": "DeepSeek V3.2 Exp",
-            "deepseek-ai/DeepSeek-V3.1-Terminus": "DeepSeek V3.1",
-            "deepseek-ai/DeepSeek-V3": "DeepSeek V3",
-            "moonshotai/Kimi-K2-Instruct-0905": "Kimi K2",
-            "Qwen/Qwen3-Next-80B-A3B-Instruct": "Qwen3 Next 80B",
-            # Deepseek 官方模型
-            "deepseek-chat": "DeepSeek Chat",
-            "deepseek-reasoner": "DeepSeek Reasoner",
-            # 保持向后兼容
-            "qwen-turbo": "Qwen Turbo",
-            "glm-4-flash": "GLM-4 Flash"
-        }
-        
-        # 反向映射：显示名称 -> 完整名称
-        self.display_to_model_map = {v: k for k, v in self.model_display_map.items()}
+        # 连接测试用的API类缓存：服务商 -> API类（首次测试时导入）
+        self._api_classes = {}
+        # 预设选择列表中各行对应的预设名
+        self._preset_names = []
+        # 温度滑块拖动时待刷新的值及是否已安排刷新
+        self._pending_temp = None
+        self._temp_scheduled = False
         
         # 创建设置窗口
         self.window = tk.Toplevel(parent)
@@ -66,8 +89,11 @@ class SettingsWindow:
         # API配置页面
         self.create_api_tab(notebook)
         
-        # 翻译设置页面
-        self.create_translation_tab(notebook)
+        # 翻译设置页面：先放空白页，首次切换到该页时再创建控件
+        self._trans_frame = ttk.Frame(notebook)
+        notebook.add(self._trans_frame, text="翻译设置")
+        self._trans_built = False
+        notebook.bind("<<NotebookTabChanged>>", self._maybe_build_trans_tab)
         
         # 按钮框架
         button_frame = ttk.Frame(self.window)
@@ -119,30 +145,16 @@ class SettingsWindow:
         
         # 获取当前模型名称并转换为显示名称
         current_model = self.api_config.get("model_name", "deepseek-ai/DeepSeek-V3.1-Terminus")
-        current_display = self.model_display_map.get(current_model, current_model)
+        current_display = _MODEL_DISPLAY_MAP.get(current_model, current_model)
         
         self.model_var = tk.StringVar(value=current_display)
         
-        # 根据提供商设置模型选项
-        self.siliconflow_models = [
-            "DeepSeek V3.2 Exp",
-            "DeepSeek V3.1",
-            "DeepSeek V3",
-            "Kimi K2",
-            "Qwen3 Next 80B"
-        ]
-        
-        self.deepseek_models = [
-            "DeepSeek Chat",
-            "DeepSeek Reasoner"
-        ]
-        
         # 根据当前提供商选择模型列表
         current_provider = self.provider_var.get()
         if current_provider == "deepseek":
-            model_display_values = self.deepseek_models
+            model_display_values = _DEEPSEEK_MODELS
         else:
-            model_display_values = self.siliconflow_models
+            model_display_values = _SILICONFLOW_MODELS
         
         self.model_combo = ttk.Combobox(api_frame, textvariable=self.model_var,
                                   values=model_display_values, width=30, state="readonly")
@@ -167,11 +179,15 @@ class SettingsWindow:
         self.temp_label.grid(row=5, column=2, padx=5, pady=10)
         temperature_scale.configure(command=self.update_temperature_label)
         
-    def create_translation_tab(self, notebook):
-        """创建翻译设置页面"""
-        trans_frame = ttk.Frame(notebook)
-        notebook.add(trans_frame, text="翻译设置")
-        
+    def _maybe_build_trans_tab(self, event):
+        """首次切换到翻译设置页时创建页面控件"""
+        notebook = event.widget
+        if not self._trans_built and notebook.index('current') == 1:
+            self.create_translation_tab(self._trans_frame)
+            self._trans_built = True
+            
+    def create_translation_tab(self, trans_frame):
+        """在给定页面中创建翻译设置控件"""
         # 添加提示信息
         tip_label = ttk.Label(trans_frame, text="建议使用文本库功能确定人名、地名等专有名词，这将显著提升翻译效果！", 
                              foreground="#0066CC", font=('TkDefaultFont', 9))
@@ -236,12 +252,12 @@ class SettingsWindow:
         
         # 更新模型列表
         if provider == "deepseek":
-            self.model_combo['values'] = self.deepseek_models
-            self.model_var.set(self.deepseek_models[0])  # 默认选择第一个
+            self.model_combo['values'] = _DEEPSEEK_MODELS
+            self.model_var.set(_DEEPSEEK_MODELS[0])  # 默认选择第一个
             self.base_url_var.set("https://api.deepseek.com/v1")
         else:  # siliconflow
-            self.model_combo['values'] = self.siliconflow_models
-            self.model_var.set(self.siliconflow_models[0])  # 默认选择第一个
+            self.model_combo['values'] = _SILICONFLOW_MODELS
+            self.model_var.set(_SILICONFLOW_MODELS[0])  # 默认选择第一个
             self.base_url_var.set("https://api.siliconflow.cn/v1")
         
         # 加载对应提供商的API密钥
@@ -252,8 +268,19 @@ class SettingsWindow:
             self.api_key_var.set("")  # 如果没有保存的密钥，清空
     
     def update_temperature_label(self, value):
-        """更新温度标签"""
-        self.temp_label.config(text=f"{float(value):.1f}")
+        """更新温度标签：拖动时只记录最新值，空闲时合并刷新一次"""
+        self._pending_temp = value
+        if self._temp_scheduled:
+            return
+        self._temp_scheduled = True
+        self.window.after_idle(self._flush_temp)
+        
+    def _flush_temp(self):
+        """把最新温度值写入标签（显示文本不变时跳过）"""
+        self._temp_scheduled = False
+        text = f"{float(self._pending_temp):.1f}"
+        if self.temp_label.cget('text') != text:
+            self.temp_label.config(text=text)
         
     def reset_prompt(self):
         """重置提示词为默认值"""
@@ -265,7 +292,7 @@ class SettingsWindow:
         """测试API连接"""
         # 将显示名称转换回完整模型名称
         display_model = self.model_var.get()
-        actual_model = self.display_to_model_map.get(display_model, display_model)
+        actual_model = _DISPLAY_TO_MODEL.get(display_model, display_model)
         
         # 获取当前输入的配置
         test_config = {
@@ -290,13 +317,7 @@ class SettingsWindow:
         """测试连接工作线程"""
         try:
             provider = config.get("provider", "siliconflow")
-            
-            if provider == "deepseek":
-                from ..api.deepseek_api import DeepseekAPI
-                api = DeepseekAPI(config)
-            else:
-                from ..api.siliconflow_api import SiliconFlowAPI
-                api = SiliconFlowAPI(config)
+            api = self._get_api_class(provider)(config)
             
             success = api.test_connection()
             
@@ -306,14 +327,26 @@ class SettingsWindow:
                 self.window.after(0, lambda: messagebox.showerror("测试失败", "API连接测试失败，请检查配置"))
                 
         except Exception as e:
-            self.window.after(0, lambda: messagebox.showerror("测试错误", f"连接测试出错: {str(e)}"))
+            error_msg = str(e)
+            self.window.after(0, lambda: messagebox.showerror("测试错误", f"连接测试出错: {error_msg}"))
+            
+    def _get_api_class(self, provider):
+        """按服务商获取API类，首次使用时导入并缓存"""
+        api_class = self._api_classes.get(provider)
+        if api_class is None:
+            if provider == "deepseek":
+                from ..api.deepseek_api import DeepseekAPI as api_class
+            else:
+                from ..api.siliconflow_api import SiliconFlowAPI as api_class
+            self._api_classes[provider] = api_class
+        return api_class
             
     def save_settings(self):
         """保存设置"""
         try:
             # 将显示名称转换回完整模型名称
             display_model = self.model_var.get()
-            actual_model = self.display_to_model_map.get(display_model, display_model)
+            actual_model = _DISPLAY_TO_MODEL.get(display_model, display_model)
             
             # 更新API配置
             new_api_config = {
@@ -326,13 +359,17 @@ class SettingsWindow:
             }
             
             # 更新应用配置
-            new_app_config = {
-                "target_language": self.target_lang_var.get(),
-                "context_lines": self.context_lines_var.get(),
-                "batch_lines": self.batch_lines_var.get(),
-                "auto_save": self.auto_save_var.get(),
-                "translation_prompt": self.prompt_text.get(1.0, tk.END).strip()
-            }
+            if self._trans_built:
+                new_app_config = {
+                    "target_language": self.target_lang_var.get(),
+                    "context_lines": self.context_lines_var.get(),
+                    "batch_lines": self.batch_lines_var.get(),
+                    "auto_save": self.auto_save_var.get(),
+                    "translation_prompt": self.prompt_text.get(1.0, tk.END).strip()
+                }
+            else:
+                # 翻译设置页未打开过，原样写回当前配置（默认值只在 create_translation_tab 中维护）
+                new_app_config = dict(self.app_config)
             
             # 保存配置
             if self.config_manager.save_api_config(new_api_config) and \
@@ -401,10 +438,16 @@ class SettingsWindow:
         preset_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         preset_scroll.pack(side=tk.RIGHT, fill=tk.Y)
         
-        # 填充预设列表
-        for preset_name, preset_data in presets.items():
-            display_text = f"{preset_name} ({preset_data.get('model_name', '未知模型')})"
-            preset_listbox.insert(tk.END, display_text)
+        # 填充预设列表：预设名按列表顺序保存，与列表框行号一一对应
+        self._preset_names = list(presets.keys())
+        items = [f"{name} ({data.get('model_name', '未知模型')})" for name, data in presets.items()]
+        if len(items) <= 1000:
+            preset_listbox.insert(tk.END, *items)
+        else:
+            # 预设很多时分批插入，让窗口逐步刷新
+            for start in range(0, len(items), 500):
+                preset_listbox.insert(tk.END, *items[start:start + 500])
+                preset_listbox.update_idletasks()
             
         # 按钮框架
         button_frame = ttk.Frame(preset_window)
@@ -416,7 +459,7 @@ class SettingsWindow:
                 messagebox.showwarning("选择预设", "请选择一个预设")
                 return
                 
-            preset_name = list(presets.keys())[selection[0]]
+            preset_name = self._preset_names[selection[0]]
             preset_data = presets[preset_name]
             
             # 加载预设数据
@@ -432,11 +475,12 @@ class SettingsWindow:
                 messagebox.showwarning("删除预设", "请选择一个预设")
                 return
                 
-            preset_name = list(presets.keys())[selection[0]]
+            preset_name = self._preset_names[selection[0]]
             
             if messagebox.askyesno("确认删除", f"确定要删除预设 '{preset_name}' 吗？"):
                 if self.config_manager.delete_api_preset(preset_name):
                     preset_listbox.delete(selection[0])
+                    del self._preset_names[selection[0]]
                     messagebox.showinfo("删除成功", f"预设 '{preset_name}' 已删除")
                 else:
                     messagebox.showerror("删除失败", "删除预设失败")
@@ -4,16 +4,93 @@
 文件处理工具模块
 """
 
+import codecs
+import mmap
 import os
+import shutil
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from itertools import zip_longest
 from pathlib import Path
-from typing import Optional
-import chardet
+from typing import List, Optional
 import re
-from html import unescape
+
+# chardet 首次需要检测编码时才导入，缩短程序启动时间
+chardet = None
+
+
+def _load_chardet():
+    """首次调用时导入chardet并缓存到模块全局"""
+    global chardet
+    if chardet is None:
+        import chardet as _chardet
+        chardet = _chardet
+    return chardet
+
+# EPUB文本清理用正则（模块级预编译）
+_RE_BLANK_LINES = re.compile(r'\n\s*\n')
+_RE_HSPACE = re.compile(r'[ \t]+')
+# 提取文本前需要移除的标签：脚本、样式，以及注音（ruby）的读音<rt>和括号<rp>，避免假名混入正文
+_HTML_NON_TEXT_TAGS = ('script', 'style', 'rt', 'rp')
+# 每个线程独立的lxml HTML解析器：lxml的解析器同一时刻只能被一个线程使用，
+# 共用模块级默认解析器会让并行解析退化为串行
+_thread_parsers = threading.local()
+
+
+def _create_temp_file(target: Path):
+    """在目标所在目录独占创建唯一命名的临时文件，返回 (文件描述符, 路径)
+    
+    以0o666创建，由内核按umask得到与普通open相同的默认权限
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    while True:
+        tmp_name = str(target.parent / f"{target.name}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            return os.open(tmp_name, flags, 0o666), tmp_name
+        except FileExistsError:
+            continue
+
+
+def atomic_write(file_path, data: bytes, fsync: bool = False) -> None:
+    """原子写入字节内容：先写同目录下的唯一临时文件，再替换目标文件，读取方不会看到写了一半的内容
+    
+    目标是符号链接时写入其指向的文件；目标已存在时沿用其权限；fsync为True时替换前确保数据落盘。
+    失败时删除临时文件并抛出异常
+    """
+    target = Path(os.path.realpath(file_path))
+    fd, tmp_name = _create_temp_file(target)
+    try:
+        try:
+            # 直接写文件描述符，不再额外分配与内容等大的缓冲区
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            if fsync:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+        if target.exists():
+            shutil.copymode(target, tmp_name)
+        os.replace(tmp_name, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
 
 class FileHandler:
+    # EPUB解析依赖模块缓存（首次成功导入后复用）
+    _epub_mods = None
+    
     def __init__(self):
         self.supported_encodings = ['utf-8', 'gbk', 'gb2312', 'utf-16']
+        # 编码检测结果缓存：(路径, 修改时间ns, 大小) -> 编码，同一文件重复读取时跳过检测
+        self._enc_cache = {}
+        # 文本文件判断缓存：(路径, 修改时间ns, 大小) -> 是否为文本文件
+        self._text_probe_cache = {}
         
     def read_file(self, file_path: str) -> str:
         """读取文件内容，自动检测编码，支持EPUB格式"""
@@ -24,88 +101,143 @@ class FileHandler:
             if file_path.suffix.lower() == '.epub':
                 return self._read_epub_file(file_path)
             
-            # 读取普通文件字节内容
-            with open(file_path, 'rb') as f:
-                raw_data = f.read()
-                
-            # 检测编码
-            detected = chardet.detect(raw_data)
-            encoding = detected.get('encoding', 'utf-8')
-            
-            # 如果检测到的编码不在支持列表中，使用utf-8
-            if encoding not in self.supported_encodings:
-                encoding = 'utf-8'
+            # 读取普通文件字节内容：通过mmap映射，检测编码只访问开头部分，解码直接读取页缓存
+            stat = file_path.stat()
+            if stat.st_size == 0:
+                return ""
+            cache_key = (str(file_path), stat.st_mtime_ns, stat.st_size)
+            with open(file_path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as raw_data:
                 
-            # 尝试用检测到的编码读取
-            try:
-                content = raw_data.decode(encoding)
-                return content
-            except UnicodeDecodeError:
-                # 如果失败，尝试其他编码
-                for enc in self.supported_encodings:
-                    try:
-                        content = raw_data.decode(enc)
-                        return content
-                    except UnicodeDecodeError:
-                        continue
+                encoding = self._enc_cache.get(cache_key)
+                if encoding is None:
+                    # 先按BOM/ASCII/UTF-8特征快速判断，无法确定时才对前64KB运行chardet
+                    prefix = raw_data[:65536]
+                    encoding = self._fast_detect(prefix)
+                    if encoding is None:
+                        detected = _load_chardet().detect(prefix)
+                        encoding = detected.get('encoding') or 'utf-8'
                         
-                # 如果所有编码都失败，使用utf-8并忽略错误
-                return raw_data.decode('utf-8', errors='ignore')
+                        # 如果检测到的编码不在支持列表中，使用utf-8
+                        if encoding not in self.supported_encodings:
+                            encoding = 'utf-8'
+                    
+                # 尝试用检测到的编码读取；只缓存真正解码成功的编码
+                try:
+                    text = str(raw_data, encoding)
+                    self._enc_cache[cache_key] = encoding
+                    return text
+                except UnicodeDecodeError:
+                    # 如果失败，尝试其他编码：先用前8KB试解码，通过后才解码全文
+                    probe = raw_data[:8192]
+                    for enc in self.supported_encodings:
+                        if enc == encoding:
+                            continue
+                        try:
+                            codecs.getincrementaldecoder(enc)().decode(probe, final=False)
+                            text = str(raw_data, enc)
+                            self._enc_cache[cache_key] = enc
+                            return text
+                        except UnicodeDecodeError:
+                            continue
+                            
+                    # 如果所有编码都失败，使用utf-8并忽略错误
+                    return str(raw_data, 'utf-8', 'ignore')
                 
         except Exception as e:
             raise Exception(f"读取文件失败: {str(e)}")
             
-    def _read_epub_file(self, file_path: Path) -> str:
-        """读取EPUB文件内容，提取纯文本，支持多语言编码"""
+    @staticmethod
+    def _fast_detect(raw: bytes) -> Optional[str]:
+        """根据BOM和开头字节快速判断编码，无法判断时返回None"""
+        if raw.startswith(b'\xef\xbb\xbf'):
+            return 'utf-8-sig'
+        if raw.startswith(b'\xff\xfe') or raw.startswith(b'\xfe\xff'):
+            return 'utf-16'
+        head = raw[:4096]
+        if head.isascii():
+            return 'utf-8'
+        # 增量解码，允许开头4KB末尾截断半个多字节字符
+        try:
+            codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+            return 'utf-8'
+        except UnicodeDecodeError:
+            return None
+            
+    @classmethod
+    def _load_epub_mods(cls):
+        """导入EPUB解析所需模块并缓存在类属性上，lxml不可用时回退到BeautifulSoup"""
+        if cls._epub_mods is not None:
+            return cls._epub_mods
+            
         try:
             import ebooklib
             from ebooklib import epub
-            from bs4 import BeautifulSoup
         except ImportError:
-            raise Exception("需要安装ebooklib和beautifulsoup4库来支持EPUB文件")
+            raise Exception("需要安装ebooklib库来支持EPUB文件")
+        
+        # 优先使用C实现的lxml解析HTML，未安装时回退到BeautifulSoup的html.parser
+        etree = lxml_html = BeautifulSoup = None
+        try:
+            from lxml import etree, html as lxml_html
+        except ImportError:
+            try:
+                from bs4 import BeautifulSoup
+            except ImportError:
+                raise Exception("需要安装lxml或beautifulsoup4库来支持EPUB文件")
+        
+        cls._epub_mods = (ebooklib, epub, etree, lxml_html, BeautifulSoup)
+        return cls._epub_mods
+            
+    def _html_to_text(self, content: bytes) -> str:
+        """把单个HTML文档转换为纯文本（移除脚本、样式和注音读音）：优先lxml，未安装时使用BeautifulSoup"""
+        _, _, etree, lxml_html, BeautifulSoup = self._load_epub_mods()
+        
+        if lxml_html is not None:
+            # 空文档lxml会报错，直接视为无文本
+            if not content.strip():
+                return ''
+            # 用本线程的解析器解析原始字节：libxml2的HTML解析器不识别XML声明中的编码，缺少<meta charset>时
+            # 会按Latin-1解码，因此显式指定UTF-8（EPUB内容文档要求UTF-8）；在C层完成剥离标签和取文本
+            parser = getattr(_thread_parsers, 'html', None)
+            if parser is None:
+                parser = _thread_parsers.html = lxml_html.HTMLParser(encoding='utf-8')
+            try:
+                root = lxml_html.fromstring(content, parser=parser)
+            except (etree.ParserError, etree.XMLSyntaxError):
+                # 只有XML声明、注释或空白标记的文档没有可解析的元素，视为无文本
+                return ''
+            etree.strip_elements(root, *_HTML_NON_TEXT_TAGS, with_tail=False)
+            return root.text_content()
+        
+        soup = BeautifulSoup(content.decode('utf-8', errors='ignore'), 'html.parser')
+        for script in soup(_HTML_NON_TEXT_TAGS):
+            script.decompose()
+        return soup.get_text()
+        
+    def _epub_item_text(self, item) -> str:
+        """提取单个EPUB文档的纯文本并清理空白"""
+        text = self._html_to_text(item.get_content())
+        # 清理文本：合并多个空行、合并多个空格（解析器已解码HTML实体）
+        return _RE_HSPACE.sub(' ', _RE_BLANK_LINES.sub('\n\n', text)).strip()
+        
+    def _read_epub_file(self, file_path: Path) -> str:
+        """读取EPUB文件内容，提取纯文本，支持多语言编码"""
+        ebooklib, epub = self._load_epub_mods()[:2]
             
         try:
             # 读取EPUB文件
             book = epub.read_epub(str(file_path))
             
-            # 存储所有文本内容
-            text_content = []
+            # 按原顺序收集所有文档项目
+            docs = [item for item in book.get_items() if item.get_type() == ebooklib.ITEM_DOCUMENT]
             
-            # 获取所有文档项目
-            for item in book.get_items():
-                if item.get_type() == ebooklib.ITEM_DOCUMENT:
-                    # 获取HTML内容
-                    html_content = item.get_content().decode('utf-8', errors='ignore')
-                    
-                    # 使用BeautifulSoup解析HTML
-                    soup = BeautifulSoup(html_content, 'html.parser')
-                    
-                    # 移除脚本和样式标签
-                    for script in soup(["script", "style"]):
-                        script.decompose()
-                    
-                    # 提取纯文本
-                    text = soup.get_text()
-                    
-                    # 清理文本：移除多余的空白字符
-                    text = re.sub(r'\n\s*\n', '\n\n', text)  # 合并多个空行
-                    text = re.sub(r'[ \t]+', ' ', text)      # 合并多个空格
-                    text = text.strip()
-                    
-                    if text:
-                        text_content.append(text)
+            # 多线程并行解析各文档（各线程使用自己的lxml解析器，解析时释放GIL），map保持原有顺序
+            with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+                parts = [text for text in executor.map(self._epub_item_text, docs) if text]
             
             # 合并所有文本内容
-            full_text = '\n\n'.join(text_content)
-            
-            # HTML实体解码，确保特殊字符正确显示
-            full_text = unescape(full_text)
-            
-            # 确保返回的文本是UTF-8编码
-            if isinstance(full_text, bytes):
-                full_text = full_text.decode('utf-8', errors='ignore')
-            
-            return full_text
+            return '\n\n'.join(parts)
             
         except Exception as e:
             raise Exception(f"读取EPUB文件失败: {str(e)}")
@@ -118,9 +250,8 @@ class FileHandler:
             # 确保目录存在
             file_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # 保存文件
-            with open(file_path, 'w', encoding=encoding) as f:
-                f.write(content)
+            # 一次编码后原子写入，避免写入中断留下残缺文件
+            atomic_write(file_path, content.encode(encoding))
                 
             return True
             
@@ -132,29 +263,21 @@ class FileHandler:
         """兼容旧调用：保存文件内容，委托到 write_file"""
         return self.write_file(file_path, content, encoding)
             
-    def create_comparison_file(self, source_content: str, target_content: str) -> str:
-        """创建原文译文对照文件"""
-        source_lines = source_content.split('\n')
-        target_lines = target_content.split('\n')
+    def create_comparison_file(self, source_lines: List[str], target_lines: List[str]) -> str:
+        """根据按行拆分的原文、译文列表创建对照文件内容"""
+        header = "\n".join(["=" * 60, "原文译文对照文件", "=" * 60, ""])
+        sep = "-" * 40
         
-        comparison_lines = []
-        comparison_lines.append("=" * 60)
-        comparison_lines.append("原文译文对照文件")
-        comparison_lines.append("=" * 60)
-        comparison_lines.append("")
+        # 每行生成一个对照块，跳过原文译文都为空的行，最后一次性拼接
+        body = "\n".join(
+            f"【原文 {i:03d}】 {source_line}\n【译文 {i:03d}】 {target_line}\n{sep}"
+            for i, (source_line, target_line) in enumerate(
+                zip_longest(source_lines, target_lines, fillvalue=""), 1
+            )
+            if source_line.strip() or target_line.strip()
+        )
         
-        max_lines = max(len(source_lines), len(target_lines))
-        
-        for i in range(max_lines):
-            source_line = source_lines[i] if i < len(source_lines) else ""
-            target_line = target_lines[i] if i < len(target_lines) else ""
-            
-            if source_line.strip() or target_line.strip():
-                comparison_lines.append(f"【原文 {i+1:03d}】 {source_line}")
-                comparison_lines.append(f"【译文 {i+1:03d}】 {target_line}")
-                comparison_lines.append("-" * 40)
-                
-        return '\n'.join(comparison_lines)
+        return "\n".join([header, body]) if body else header
         
     def auto_generate_filename(self, original_filename: str = None) -> str:
         """自动生成译文文件名"""
@@ -199,21 +322,29 @@ class FileHandler:
         if file_path.suffix.lower() in text_extensions:
             return True
             
-        # 尝试读取文件开头判断
+        # 尝试读取文件开头判断（文件未修改时复用上次结果）
         try:
+            stat = file_path.stat()
+            cache_key = (str(file_path), stat.st_mtime_ns, stat.st_size)
+            is_text = self._text_probe_cache.get(cache_key)
+            if is_text is not None:
+                return is_text
+                
             with open(file_path, 'rb') as f:
                 chunk = f.read(1024)
                 
-            # 检测是否包含null字节（二进制文件特征）
+            # 检测是否包含null字节（二进制文件特征），再尝试解码
             if b'\x00' in chunk:
-                return False
-                
-            # 尝试解码
-            try:
-                chunk.decode('utf-8')
-                return True
-            except UnicodeDecodeError:
-                return False
+                is_text = False
+            else:
+                try:
+                    chunk.decode('utf-8')
+                    is_text = True
+                except UnicodeDecodeError:
+                    is_text = False
+                    
+            self._text_probe_cache[cache_key] = is_text
+            return is_text
                 
         except:
             return False
@@ -229,18 +360,58 @@ class FileHandler:
             # 生成备份文件名
             backup_path = file_path.with_suffix(f'.backup{file_path.suffix}')
             
-            # 如果备份文件已存在，添加时间戳
             if backup_path.exists():
+                # 与最新一份备份（含带时间戳的备份）的修改时间、大小一致时（copy2保留修改时间），无需重复复制
+                src_stat = file_path.stat()
+                newest = max(self._existing_backups(file_path), key=lambda item: item[1].st_mtime_ns)
+                if (src_stat.st_mtime_ns, src_stat.st_size) == (newest[1].st_mtime_ns, newest[1].st_size):
+                    return str(newest[0])
+                    
+                # 否则添加时间戳另存一份
                 from datetime import datetime
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 backup_path = file_path.with_suffix(f'.backup_{timestamp}{file_path.suffix}')
                 
             # 复制文件
-            import shutil
-            shutil.copy2(file_path, backup_path)
+            self._copy_file(file_path, backup_path)
             
             return str(backup_path)
             
         except Exception as e:
             print(f"备份文件失败: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    @staticmethod
+    def _existing_backups(file_path: Path):
+        """列出文件已有的备份（.backup 及带时间戳的 .backup_<时间>），返回 (路径, stat) 列表"""
+        prefix = f"{file_path.stem}.backup"
+        backups = []
+        for entry in os.scandir(file_path.parent):
+            name = entry.name
+            if not name.endswith(file_path.suffix):
+                continue
+            middle = name[len(prefix):len(name) - len(file_path.suffix)]
+            if name.startswith(prefix) and (middle == '' or middle.startswith('_')) and entry.is_file():
+                backups.append((Path(entry.path), entry.stat()))
+        return backups
+
+    def _copy_file(self, src: Path, dst: Path):
+        """复制文件内容及元数据：支持时用copy_file_range在内核中复制，否则回退到shutil.copy2"""
+        if hasattr(os, 'copy_file_range'):
+            try:
+                with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                    remaining = os.fstat(fsrc.fileno()).st_size
+                    while remaining > 0:
+                        copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                        if copied == 0:
+                            # 未复制完就返回0（如源文件被截断或文件系统不支持），交给copy2重新完整复制
+                            break
+                        remaining -= copied
+                if remaining == 0:
+                    shutil.copystat(src, dst)
+                    return
+            except OSError:
+                # 文件系统不支持时回退
+                pass
+                
+        shutil.copy2(src, dst)
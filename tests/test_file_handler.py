@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件处理工具测试
+"""
+
+import unittest
+
+from src.utils.file_handler import FileHandler
+
+try:
+    import lxml  # noqa: F401
+except ImportError:
+    lxml = None
+
+
+@unittest.skipIf(lxml is None, "需要安装lxml")
+class HtmlToTextTest(unittest.TestCase):
+    def setUp(self):
+        self.handler = FileHandler()
+
+    def test_declaration_only_document_returns_empty_text(self):
+        """只有XML声明的文档不应让解析报错，按无文本处理"""
+        content = b'<?xml version="1.0" encoding="UTF-8"?>\n'
+        self.assertEqual(self.handler._html_to_text(content), '')
+
+    def test_comment_only_document_returns_empty_text(self):
+        content = b'<?xml version="1.0" encoding="UTF-8"?>\n<!-- empty -->\n'
+        self.assertEqual(self.handler._html_to_text(content), '')
+
+    def test_utf8_text_without_meta_charset(self):
+        """没有<meta charset>时也按UTF-8解码"""
+        content = '<?xml version="1.0" encoding="UTF-8"?><html><body><p>日本語</p></body></html>'.encode('utf-8')
+        self.assertEqual(self.handler._html_to_text(content).strip(), '日本語')
+
+    def test_ruby_reading_is_dropped(self):
+        """注音（ruby）只保留正文，<rt>读音和<rp>括号不进入文本"""
+        content = ('<html><body><p>「会話」と<ruby>漢字<rp>(</rp><rt>かんじ</rt><rp>)</rp></ruby></p>'
+                   '</body></html>').encode('utf-8')
+        self.assertEqual(self.handler._html_to_text(content).strip(), '「会話」と漢字')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+EPUB结构检查工具测试
+"""
+
+import unittest
+
+try:
+    from tools.inspect_epub_structure import _MATCH_TAGS, block_texts, local_name, parse_chapter
+except ImportError:
+    parse_chapter = None
+
+
+@unittest.skipIf(parse_chapter is None, "需要安装lxml和ebooklib")
+class BlockTextsTest(unittest.TestCase):
+    def _blocks(self, body):
+        content = ('<html xmlns="http://www.w3.org/1999/xhtml"><body>' + body + '</body></html>').encode('utf-8')
+        root = parse_chapter(content)
+        return [(local_name(node.tag),) + block_texts(node) for node in root.iter(*_MATCH_TAGS)]
+
+    def test_comment_child_is_skipped(self):
+        """块内含注释时不报错，注释不算嵌套文本"""
+        blocks = self._blocks('<div class="main"><!-- start --><p>本文&nbsp;です</p></div>')
+        self.assertEqual(blocks[0], ('div', '', '本文\xa0です', True))
+        self.assertEqual(blocks[1], ('p', '本文\xa0です', '本文\xa0です', False))
+
+    def test_text_after_comment_is_direct_text(self):
+        blocks = self._blocks('<p>前<!-- note -->後<?pi x?>尾</p>')
+        self.assertEqual(blocks, [('p', '前後尾', '前後尾', False)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+主窗口界面更新队列测试（不创建Tk窗口，只测试队列逻辑）
+"""
+
+import queue
+import threading
+import unittest
+
+from src.ui.main_window import MainWindow
+
+
+class PostUiTest(unittest.TestCase):
+    def setUp(self):
+        self.window = MainWindow.__new__(MainWindow)
+        self.window._ui_queue = queue.Queue(maxsize=2)
+        self.calls = []
+
+    def _callback(self, name):
+        return lambda: self.calls.append(name)
+
+    def test_main_thread_post_to_full_queue_does_not_block(self):
+        """主线程向已满的队列投递时先处理已排队的更新，不会死锁，且保持顺序"""
+        self.window._post_ui('batch', None, self._callback('batch1'))
+        self.window._post_ui('batch', None, self._callback('batch2'))
+        self.assertTrue(self.window._ui_queue.full())
+        
+        # 在主线程上直接调用：旧实现会在这里永久阻塞
+        self.assertIs(threading.current_thread(), threading.main_thread())
+        self.window._post_ui('complete', None, self._callback('complete'))
+        
+        self.assertEqual(self.calls, ['batch1', 'batch2'])
+        self.window._process_ui_queue()
+        self.assertEqual(self.calls, ['batch1', 'batch2', 'complete'])
+
+    def test_stream_update_dropped_when_queue_full(self):
+        self.window._post_ui('batch', None, self._callback('batch1'))
+        self.window._post_ui('batch', None, self._callback('batch2'))
+        self.window._post_ui('stream', ('translate', 0), self._callback('stream'))
+        self.window._process_ui_queue()
+        self.assertEqual(self.calls, ['batch1', 'batch2'])
+
+
+class SplitStreamingLinesTest(unittest.TestCase):
+    def setUp(self):
+        self.window = MainWindow.__new__(MainWindow)
+
+    def test_blank_runs_collapse_to_one(self):
+        self.assertEqual(self.window._split_streaming_lines('\n\na\n\n \nb'), ['a', '', 'b'])
+
+    def test_trailing_blank_lines_keep_one_empty_line(self):
+        """结尾的空行只保留一个，不能多写一行空译文覆盖下一行"""
+        self.assertEqual(self.window._split_streaming_lines('a\n\n'), ['a', ''])
+        self.assertEqual(self.window._split_streaming_lines('a\n \n'), ['a', ''])
+        self.assertEqual(self.window._split_streaming_lines('a\n\n  '), ['a', ''])
+
+    def test_blank_text_gives_no_lines(self):
+        self.assertEqual(self.window._split_streaming_lines(' \n\n'), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
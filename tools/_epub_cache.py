@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+EPUB解析缓存
+供tools下的检查脚本共用：同一进程内多次读取同一EPUB时只解析一次
+"""
+
+import functools
+import os
+
+from ebooklib import epub
+
+
+@functools.lru_cache(maxsize=4)
+def _read_epub_cached(path: str, mtime_ns: int, size: int):
+    """解析EPUB；以修改时间和大小作为缓存键，文件变化后自动重新解析"""
+    return epub.read_epub(path)
+
+
+def load_epub(path: str):
+    """读取EPUB文件，文件未变化时复用已解析的book对象"""
+    stat = os.stat(path)
+    return _read_epub_cached(str(path), stat.st_mtime_ns, stat.st_size)
@@ -7,6 +7,26 @@
 import json
 from pathlib import Path
 
+# orjson 可选：安装时用于加速解析和序列化，否则使用标准库json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _loads(raw: bytes):
+    """解析JSON字节"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+
+def _dumps(data) -> bytes:
+    """序列化为缩进2格的UTF-8 JSON字节（不转义非ASCII字符）"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
 
 def add_navigation_to_spine(mapping_dir: str):
     """添加导航文档到spine顺序"""
@@ -22,9 +42,9 @@ def add_navigation_to_spine(mapping_dir: str):
         return False
     
     try:
-        # 读取数据
-        with open(format_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        # 读取数据（保留原始字节用于备份）
+        raw = format_file.read_bytes()
+        data = _loads(raw)
         
         spine_order = data.get("spine_order", [])
         print(f"📖 当前spine_order: {len(spine_order)}个章节")
@@ -39,15 +59,13 @@ def add_navigation_to_spine(mapping_dir: str):
         spine_order.insert(0, nav_doc)
         data["spine_order"] = spine_order
         
-        # 备份
+        # 备份：直接写入原文件字节，无需重新序列化
         backup_file = format_file.with_suffix('.json.bak2')
-        with open(backup_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        backup_file.write_bytes(raw)
         print(f"📦 已备份到: {backup_file}")
         
         # 保存
-        with open(format_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        format_file.write_bytes(_dumps(data))
         
         print(f"✅ 已添加 {nav_doc} 到spine_order最前面")
         print(f"   新spine_order: {len(spine_order)}个章节")
@@ -7,161 +7,276 @@
 
 import sys
 import json
+import re
+import argparse
+from dataclasses import dataclass
+from operator import attrgetter
 from pathlib import Path
 
-def analyze_specific_lines(mapping_dir: str, start_line: int, end_line: int):
-    """分析指定行号范围的对齐问题"""
+# ijson 可选：安装时流式解析映射文件，只保留目标范围内的条目
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# 日文（平假名、片假名、汉字）与中文汉字字符检测
+_JP_RE = re.compile(r'[\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FAF]')
+_ZH_RE = re.compile(r'[\u4E00-\u9FAF]')
+
+# 译文中可视为对话开头的引号（半角、直角、全角弯引号）
+_DIALOGUE_OPENERS = ('"', '「', '『', '“')
+
+# 对齐问题标志位（check_alignment 的返回值）
+_ISSUE_EMPTY = 1        # 译文为空
+_ISSUE_LENGTH = 2       # 长度差异异常
+_ISSUE_NOT_CHINESE = 4  # 原文是日文但译文不是中文
+_ISSUE_DIALOGUE = 8     # 原文是对话但译文不是对话格式
+
+@dataclass(slots=True)
+class Entry:
+    """分析窗口内的映射条目"""
+    key: str
+    line_number: int
+    original_text: str
+    translated_text: str
+    chapter_id: str = ''
+    translated_at: str = ''
+    
+    @classmethod
+    def from_mapping(cls, key: str, line_number: int, value: dict) -> "Entry":
+        """从 content_mappings 中的原始条目构造"""
+        get = value.get
+        return cls(
+            key,
+            line_number,
+            get("original_text", ""),
+            get("translated_text", ""),
+            get("chapter_id", ""),
+            get("translated_at", ""),
+        )
+
+def iter_content_mappings(content_file: Path):
+    """逐个产出 content_mappings 中的 (键, 条目)；未安装ijson时整体加载"""
+    if ijson is not None:
+        with open(content_file, 'rb') as f:
+            yield from ijson.kvitems(f, 'content_mappings')
+    else:
+        data = json.loads(content_file.read_text(encoding="utf-8"))
+        yield from data.get("content_mappings", {}).items()
+
+def _as_line_number(line_num) -> int:
+    """把条目的line_number转为整数（通常已是int，直接返回）；缺失时返回0"""
+    if not line_num:
+        return 0
+    return line_num if type(line_num) is int else int(line_num)
+
+def check_alignment(original_text: str, translated_text: str) -> int:
+    """检查单行的对齐问题，返回问题标志位的组合（0 表示正常）"""
+    issues = 0
+    
+    # 1. 检查译文是否为空
+    if not translated_text.strip():
+        issues |= _ISSUE_EMPTY
+    
+    if original_text and translated_text:
+        # 2. 检查原文和译文长度差异过大（比例 >3 或 <0.3，用整数比较避免除法）
+        orig_len = len(original_text)
+        trans_len = len(translated_text)
+        if trans_len > 3 * orig_len or 10 * trans_len < 3 * orig_len:
+            issues |= _ISSUE_LENGTH
+        
+        # 3. 检查是否包含日文字符但译文是中文
+        if (not issues & _ISSUE_EMPTY
+                and _JP_RE.search(original_text) is not None
+                and _ZH_RE.search(translated_text) is None):
+            issues |= _ISSUE_NOT_CHINESE
+    
+    # 4. 检查译文是否看起来像是其他行的内容
+    # 检查是否包含明显的叙述性内容而原文是对话
+    if (len(translated_text) > 20
+            and original_text.startswith('「') and original_text.endswith('」')
+            and not translated_text.startswith(_DIALOGUE_OPENERS)):
+        issues |= _ISSUE_DIALOGUE
+    
+    return issues
+
+def describe_issues(issue_flags: int, original_text: str, translated_text: str) -> list:
+    """把问题标志位转换为可读的问题描述列表"""
+    issues = []
+    if issue_flags & _ISSUE_EMPTY:
+        issues.append("译文为空")
+    if issue_flags & _ISSUE_LENGTH:
+        orig_len = len(original_text)
+        trans_len = len(translated_text)
+        issues.append(f"长度差异异常 (原文:{orig_len}字, 译文:{trans_len}字, 比例:{trans_len / orig_len:.2f})")
+    if issue_flags & _ISSUE_NOT_CHINESE:
+        issues.append("原文是日文但译文不是中文")
+    if issue_flags & _ISSUE_DIALOGUE:
+        issues.append("原文是对话但译文不是对话格式")
+    return issues
+
+def report_error(message: str, as_json: bool = False):
+    """输出错误信息：JSON 模式下输出 {"error": ...}，保证输出始终是合法JSON"""
+    if as_json:
+        sys.stdout.write(json.dumps({"error": message}, ensure_ascii=False) + '\n')
+    else:
+        print(f"❌ {message}")
+
+def analyze_specific_lines(mapping_dir: str, start_line: int, end_line: int,
+                           verbose: bool = False, as_json: bool = False):
+    """分析指定行号范围的对齐问题
+    
+    verbose 为 True 时逐行输出原文、译文等详细信息，否则只输出总结；
+    as_json 为 True 时只输出一份 JSON 结果，供脚本调用
+    """
     mapping_path = Path(mapping_dir)
     content_file = mapping_path / "content_mapping.json"
     
     if not content_file.exists():
-        print(f"❌ 文件不存在: {content_file}")
+        report_error(f"文件不存在: {content_file}", as_json)
         return False
     
-    print(f"\n{'='*80}")
-    print(f"特定行对齐问题分析")
-    print(f"{'='*80}")
-    print(f"映射文件: {content_file}")
-    print(f"分析范围: 第 {start_line} 行到第 {end_line} 行")
-    print()
+    if not as_json:
+        print(f"\n{'='*80}")
+        print(f"特定行对齐问题分析")
+        print(f"{'='*80}")
+        print(f"映射文件: {content_file}")
+        print(f"分析范围: 第 {start_line} 行到第 {end_line} 行")
+        print()
     
-    # 读取数据
+    # 读取数据，边解析边收集指定范围的条目
     try:
-        data = json.loads(content_file.read_text(encoding="utf-8"))
-        items = data.get("content_mappings", {})
+        target_entries = [
+            Entry.from_mapping(key, line_num, value)
+            for key, value in iter_content_mappings(content_file)
+            if (line_num := _as_line_number(value.get("line_number")))
+            and start_line <= line_num <= end_line
+        ]
     except Exception as e:
-        print(f"❌ 读取文件失败: {e}")
+        report_error(f"读取文件失败: {e}", as_json)
         return False
     
-    # 收集指定范围的条目
-    target_entries = []
-    for key, value in items.items():
-        line_num = value.get("line_number")
-        if line_num and start_line <= int(line_num) <= end_line:
-            target_entries.append({
-                "key": key,
-                "line_number": int(line_num),
-                "original_text": value.get("original_text", ""),
-                "translated_text": value.get("translated_text", ""),
-                "chapter_id": value.get("chapter_id", ""),
-                "translated_at": value.get("translated_at", "")
-            })
-    
     # 按行号排序
-    target_entries.sort(key=lambda x: x["line_number"])
+    target_entries.sort(key=attrgetter("line_number"))
     
-    print(f"找到 {len(target_entries)} 个条目")
-    print()
+    if not as_json:
+        print(f"找到 {len(target_entries)} 个条目")
+        print()
     
-    # 详细分析每一行
+    # 分析每一行；逐行详情只在 verbose 模式下格式化输出
+    show_details = verbose and not as_json
     alignment_issues = []
     
     for entry in target_entries:
-        print(f"{'-'*80}")
-        print(f"行号: {entry['line_number']} (键: {entry['key']})")
-        print(f"章节: {entry['chapter_id']}")
-        print(f"原文: {entry['original_text']}")
-        print(f"译文: {entry['translated_text']}")
-        print(f"翻译时间: {entry['translated_at']}")
-        
-        # 检查对齐问题
-        issues = []
-        
-        # 1. 检查译文是否为空
-        if not entry['translated_text'].strip():
-            issues.append("译文为空")
-        
-        # 2. 检查原文和译文长度差异过大
-        if entry['original_text'] and entry['translated_text']:
-            orig_len = len(entry['original_text'])
-            trans_len = len(entry['translated_text'])
-            ratio = trans_len / orig_len if orig_len > 0 else 0
-            
-            if ratio > 3 or ratio < 0.3:  # 长度差异过大
-                issues.append(f"长度差异异常 (原文:{orig_len}字, 译文:{trans_len}字, 比例:{ratio:.2f})")
-        
-        # 3. 检查是否包含日文字符但译文是中文
-        if entry['original_text'] and entry['translated_text']:
-            has_japanese = any('\u3040' <= c <= '\u309F' or '\u30A0' <= c <= '\u30FF' or '\u4E00' <= c <= '\u9FAF' for c in entry['original_text'])
-            has_chinese = any('\u4E00' <= c <= '\u9FAF' for c in entry['translated_text'])
-            
-            if has_japanese and not has_chinese and entry['translated_text'].strip():
-                issues.append("原文是日文但译文不是中文")
+        original_text = entry.original_text
+        translated_text = entry.translated_text
         
-        # 4. 检查译文是否看起来像是其他行的内容
-        if entry['translated_text'] and len(entry['translated_text']) > 20:
-            # 检查是否包含明显的叙述性内容而原文是对话
-            if entry['original_text'].startswith('「') and entry['original_text'].endswith('」'):
-                if not (entry['translated_text'].startswith('"') or entry['translated_text'].startswith('「')):
-                    issues.append("原文是对话但译文不是对话格式")
+        # 检查对齐问题，只有发现问题时才生成描述文字
+        issue_flags = check_alignment(original_text, translated_text)
+        issues = describe_issues(issue_flags, original_text, translated_text) if issue_flags else None
         
         if issues:
             alignment_issues.append({
-                "line_number": entry['line_number'],
-                "key": entry['key'],
+                "line_number": entry.line_number,
+                "key": entry.key,
                 "issues": issues
             })
-            print(f"⚠️  发现问题: {', '.join(issues)}")
-        else:
-            print("✓ 对齐正常")
         
-        print()
+        if show_details:
+            # 本行的输出先拼好，最后一次性写出
+            block = (
+                f"{'-'*80}\n"
+                f"行号: {entry.line_number} (键: {entry.key})\n"
+                f"章节: {entry.chapter_id}\n"
+                f"原文: {original_text}\n"
+                f"译文: {translated_text}\n"
+                f"翻译时间: {entry.translated_at}\n"
+            )
+            if issues:
+                block += f"⚠️  发现问题: {', '.join(issues)}\n\n"
+            else:
+                block += "✓ 对齐正常\n\n"
+            sys.stdout.write(block)
+    
+    if as_json:
+        result = {
+            "mapping_file": str(content_file),
+            "start_line": start_line,
+            "end_line": end_line,
+            "entry_count": len(target_entries),
+            "aligned": not alignment_issues,
+            "issues": alignment_issues,
+        }
+        sys.stdout.write(json.dumps(result, ensure_ascii=False, indent=2) + '\n')
+        return not alignment_issues
     
     # 总结分析结果
-    print(f"{'='*80}")
-    print(f"分析总结")
-    print(f"{'='*80}")
+    summary = [
+        f"{'='*80}",
+        f"分析总结",
+        f"{'='*80}",
+    ]
     
     if alignment_issues:
-        print(f"❌ 发现 {len(alignment_issues)} 行存在对齐问题:")
-        for issue in alignment_issues:
-            print(f"  - 第 {issue['line_number']} 行 ({issue['key']}): {', '.join(issue['issues'])}")
-        
-        print(f"\n可能的原因:")
-        print(f"  1. 翻译过程中出现了行号错位")
-        print(f"  2. 批量翻译时API返回的译文顺序与原文不匹配")
-        print(f"  3. 手动编辑时误操作导致内容错位")
-        print(f"  4. 翻译工具的对齐机制存在bug")
-        
-        print(f"\n建议修复方案:")
-        print(f"  1. 检查翻译工具的save_translations方法是否正确按line_number对齐")
-        print(f"  2. 重新翻译这些有问题的行")
-        print(f"  3. 手动修正错位的译文内容")
-        
+        summary.append(f"❌ 发现 {len(alignment_issues)} 行存在对齐问题:")
+        summary.extend(
+            f"  - 第 {issue['line_number']} 行 ({issue['key']}): {', '.join(issue['issues'])}"
+            for issue in alignment_issues
+        )
+        summary.append(
+            f"\n可能的原因:\n"
+            f"  1. 翻译过程中出现了行号错位\n"
+            f"  2. 批量翻译时API返回的译文顺序与原文不匹配\n"
+            f"  3. 手动编辑时误操作导致内容错位\n"
+            f"  4. 翻译工具的对齐机制存在bug\n"
+            f"\n建议修复方案:\n"
+            f"  1. 检查翻译工具的save_translations方法是否正确按line_number对齐\n"
+            f"  2. 重新翻译这些有问题的行\n"
+            f"  3. 手动修正错位的译文内容"
+        )
+        sys.stdout.write('\n'.join(summary) + '\n')
         return False
     else:
-        print(f"✓ 所有行对齐正常，未发现问题")
+        summary.append(f"✓ 所有行对齐正常，未发现问题")
+        sys.stdout.write('\n'.join(summary) + '\n')
         return True
 
 def main():
     """主函数"""
-    print(f"\n{'#'*80}")
-    print(f"特定行对齐问题分析工具")
-    print(f"{'#'*80}")
-    
-    if len(sys.argv) < 4:
-        print("\n用法:")
-        print("  python analyze_specific_alignment.py <mapping目录路径> <起始行号> <结束行号>")
-        print("\n示例:")
-        print("  python analyze_specific_alignment.py mapping/my_book 630 633")
-        print("  python analyze_specific_alignment.py \"C:/Users/user/Desktop/mapping/日文原版(1)\" 630 633")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description="特定行对齐问题分析工具",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+示例:
+  python analyze_specific_alignment.py mapping/my_book 630 633
+  python analyze_specific_alignment.py mapping/my_book 630 633 -v
+  python analyze_specific_alignment.py "C:/Users/user/Desktop/mapping/日文原版(1)" 630 633 --json
+        """
+    )
+    parser.add_argument("mapping_dir", help="mapping目录路径")
+    parser.add_argument("start_line", type=int, help="起始行号")
+    parser.add_argument("end_line", type=int, help="结束行号")
+    parser.add_argument("-v", "--verbose", action="store_true", help="逐行输出原文、译文等详细信息")
+    parser.add_argument("--json", action="store_true", help="以JSON格式输出分析结果")
+    args = parser.parse_args()
     
-    mapping_dir = sys.argv[1]
-    try:
-        start_line = int(sys.argv[2])
-        end_line = int(sys.argv[3])
-    except ValueError:
-        print("❌ 行号必须是数字")
+    if args.start_line > args.end_line:
+        report_error("起始行号不能大于结束行号", args.json)
         sys.exit(1)
     
-    if start_line > end_line:
-        print("❌ 起始行号不能大于结束行号")
-        sys.exit(1)
+    if not args.json:
+        print(f"\n{'#'*80}")
+        print(f"特定行对齐问题分析工具")
+        print(f"{'#'*80}")
     
     try:
-        is_aligned = analyze_specific_lines(mapping_dir, start_line, end_line)
+        is_aligned = analyze_specific_lines(
+            args.mapping_dir, args.start_line, args.end_line,
+            verbose=args.verbose, as_json=args.json
+        )
         
+        if args.json:
+            sys.exit(0 if is_aligned else 1)
         if is_aligned:
             print(f"\n{'#'*80}")
             print(f"✓ 分析完成：指定行对齐正常")
@@ -177,6 +292,9 @@ def main():
         print("\n\n分析已取消")
         sys.exit(1)
     except Exception as e:
+        if args.json:
+            report_error(f"分析异常: {e}", True)
+            sys.exit(1)
         print(f"\n❌ 分析异常: {e}")
         import traceback
         traceback.print_exc()
@@ -7,15 +7,187 @@
 
 import sys
 import json
+import argparse
+import struct
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # 添加项目根目录到路径
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+# numpy 可选：安装时用向量化方式做连续性/重复检查
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
-def check_mapping_health(mapping_dir: str):
-    """检查 mapping 文件的健康状态"""
+# 行号索引缓存（content_mapping.idx）：文件头 + 按文件顺序的 int64 行号 + 每条目的标志字节
+# 文件头记录映射文件的修改时间和大小，映射文件变化后缓存自动失效
+_INDEX_MAGIC = b'AIX1'
+_INDEX_HEADER = struct.Struct('<4sqqq')  # 标识, mtime_ns, size, 条目数
+_FLAG_TRANSLATED = 1  # 译文非空
+_FLAG_ORIGINAL = 2    # 原文非空
+
+
+def load_line_index(content_file: Path):
+    """读取行号索引缓存，返回 (行号数组, 标志字节)；缓存不存在或已过期时返回 None"""
+    index_file = content_file.with_suffix('.idx')
+    try:
+        stat = content_file.stat()
+        raw = index_file.read_bytes()
+        magic, mtime_ns, size, count = _INDEX_HEADER.unpack_from(raw, 0)
+    except (OSError, struct.error):
+        return None
+        
+    offset = _INDEX_HEADER.size
+    if (magic != _INDEX_MAGIC or (mtime_ns, size) != (stat.st_mtime_ns, stat.st_size)
+            or len(raw) != offset + count * 9):
+        return None
+        
+    line_numbers = array('q')
+    line_numbers.frombytes(raw[offset:offset + count * 8])
+    if sys.byteorder != 'little':
+        line_numbers.byteswap()
+    flags = raw[offset + count * 8:]
+    return line_numbers, flags
+
+
+def save_line_index(content_file: Path, line_numbers, flags: bytes):
+    """写入行号索引缓存（失败时忽略，不影响检查结果）"""
+    index_file = content_file.with_suffix('.idx')
+    try:
+        stat = content_file.stat()
+        values = array('q', line_numbers)
+        if sys.byteorder != 'little':
+            values.byteswap()
+        header = _INDEX_HEADER.pack(_INDEX_MAGIC, stat.st_mtime_ns, stat.st_size, len(values))
+        index_file.write_bytes(header + values.tobytes() + bytes(flags))
+    except OSError as e:
+        print(f"⚠ 写入索引缓存失败: {e}")
+
+
+def print_check_header(title: str, quiet: bool = False):
+    """输出单项检查的分节标题；quiet 模式下省略"""
+    if not quiet:
+        print(f"\n{'-'*60}")
+        print(title)
+        print(f"{'-'*60}")
+
+
+def print_progress_stats(total_count: int, translated_count: int, missing_original: int,
+                         quiet: bool = False):
+    """输出检查3（翻译进度）和检查4（数据完整性）"""
+    print_check_header("检查3：翻译进度统计", quiet)
+    
+    empty_count = total_count - translated_count
+    progress = (translated_count / total_count * 100) if total_count > 0 else 0
+    
+    print(f"总行数: {total_count}")
+    print(f"已翻译: {translated_count}")
+    print(f"未翻译: {empty_count}")
+    print(f"进度: {progress:.1f}%")
+    
+    print_check_header("检查4：数据完整性", quiet)
+    
+    if missing_original > 0:
+        print(f"⚠ 警告：发现 {missing_original} 行原文为空")
+    else:
+        print(f"✓ 所有行都有原文内容")
+
+
+def print_healthy_summary():
+    """输出健康检查总结"""
+    print(f"\n{'='*60}")
+    print("健康检查总结")
+    print(f"{'='*60}")
+    print(f"✓ 映射文件健康状态良好")
+    print(f"✓ 原文译文对齐机制正常")
+    print(f"✓ 可以安全进行翻译操作")
+
+
+def line_numbers_valid(line_numbers) -> bool:
+    """快速验证：行号排序后恰好为 1..N（连续且无重复）"""
+    total_count = len(line_numbers)
+    if np is not None:
+        ln = np.sort(np.asarray(line_numbers, dtype=np.int64))
+        return bool(total_count == 0 or (ln[0] == 1 and ln[-1] == total_count
+                                          and np.array_equal(ln, np.arange(1, total_count + 1))))
+    return sorted(line_numbers) == list(range(1, total_count + 1))
+
+
+def count_flags(flags: bytes, flag: int) -> int:
+    """统计标志字节中带有指定标志位的条目数"""
+    if np is not None:
+        return int(np.count_nonzero(np.frombuffer(flags, dtype=np.uint8) & flag))
+    return sum(1 for value in flags if value & flag)
+
+
+def find_line_number_issues(sorted_line_numbers):
+    """在已排序的行号中查找问题，返回 (不连续总数, 前10处不连续位置, 重复位置列表)
+    
+    位置为排序后的下标；第i个位置期望行号为 i+1，重复指与前一个行号相同
+    """
+    if np is not None:
+        ln = np.fromiter(sorted_line_numbers, dtype=np.int64, count=len(sorted_line_numbers))
+        discontinuity_mask = ln != np.arange(1, ln.size + 1)
+        discontinuity_count = int(np.count_nonzero(discontinuity_mask))
+        first_positions = np.flatnonzero(discontinuity_mask)[:10].tolist() if discontinuity_count else []
+        duplicate_positions = (np.flatnonzero(ln[1:] == ln[:-1]) + 1).tolist()
+        return discontinuity_count, first_positions, duplicate_positions
+        
+    discontinuity_positions = [i for i, actual in enumerate(sorted_line_numbers) if actual != i + 1]
+    duplicate_positions = [
+        i for i in range(1, len(sorted_line_numbers))
+        if sorted_line_numbers[i] == sorted_line_numbers[i - 1]
+    ]
+    return len(discontinuity_positions), discontinuity_positions[:10], duplicate_positions
+
+
+def run_parallel_checks(line_numbers, flags: bytes):
+    """执行相互独立的遍历：行号验证、译文计数、原文计数
+    
+    各项检查只读同一份数据；安装numpy时计算在C层释放GIL，用线程并行执行，
+    未安装时都是持有GIL的纯Python循环，线程只会增加开销，因此依次执行
+    返回 (行号是否有效, 已翻译条目数, 原文非空条目数)
+    """
+    if np is None:
+        return (line_numbers_valid(line_numbers),
+                count_flags(flags, _FLAG_TRANSLATED),
+                count_flags(flags, _FLAG_ORIGINAL))
+    
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        valid = executor.submit(line_numbers_valid, line_numbers)
+        translated = executor.submit(count_flags, flags, _FLAG_TRANSLATED)
+        has_original = executor.submit(count_flags, flags, _FLAG_ORIGINAL)
+        return valid.result(), translated.result(), has_original.result()
+
+
+def check_from_index(line_numbers, flags: bytes, quiet: bool = False) -> bool:
+    """基于索引缓存检查：行号从1连续递增且无重复时输出完整结果并返回True，否则返回False"""
+    total_count = len(line_numbers)
+    valid, translated_count, original_count = run_parallel_checks(line_numbers, flags)
+    if not valid:
+        return False
+        
+    print(f"(使用行号索引缓存)")
+    print(f"总条目数: {total_count}")
+    
+    print_check_header("检查1：line_number 字段完整性", quiet)
+    print(f"✓ 所有条目都有 line_number 字段")
+    
+    print_check_header("检查2：line_number 连续性", quiet)
+    print(f"✓ line_number 从 1 到 {total_count} 连续递增")
+    print(f"✓ 没有重复的 line_number")
+    
+    print_progress_stats(total_count, translated_count, total_count - original_count, quiet)
+    print_healthy_summary()
+    return True
+
+
+def check_mapping_health(mapping_dir: str, quiet: bool = False):
+    """检查 mapping 文件的健康状态（quiet 为 True 时省略各项检查的分节标题）"""
     mapping_path = Path(mapping_dir)
     content_file = mapping_path / "content_mapping.json"
     
@@ -29,6 +201,11 @@ def check_mapping_health(mapping_dir: str):
     print(f"映射文件: {content_file}")
     print()
     
+    # 映射文件未变化且缓存显示健康时，直接使用索引缓存，无需解析JSON
+    index = load_line_index(content_file)
+    if index is not None and check_from_index(*index, quiet=quiet):
+        return True
+    
     # 读取数据
     try:
         data = json.loads(content_file.read_text(encoding="utf-8"))
@@ -41,24 +218,25 @@ def check_mapping_health(mapping_dir: str):
     print(f"总条目数: {total_count}")
     
     # 检查1：line_number 字段完整性
-    print(f"\n{'-'*60}")
-    print("检查1：line_number 字段完整性")
-    print(f"{'-'*60}")
+    print_check_header("检查1：line_number 字段完整性", quiet)
     
+    # 按文件顺序的平行数组：键、行号、标志字节（译文/原文是否非空），不保留文本本身
     missing_line_number = []
-    entries = []
+    keys = []
+    line_numbers = []
+    flags = bytearray()
     
     for key, value in items.items():
-        line_num = value.get("line_number")
-        if line_num is None:
+        get = value.get
+        if (line_num := get("line_number")) is None:
             missing_line_number.append(key)
         else:
-            entries.append({
-                "key": key,
-                "line_number": int(line_num),
-                "original_text": value.get("original_text", ""),
-                "translated_text": value.get("translated_text", "")
-            })
+            keys.append(key)
+            line_numbers.append(line_num if type(line_num) is int else int(line_num))
+            flags.append(
+                (_FLAG_TRANSLATED if get("translated_text", "").strip() else 0)
+                | (_FLAG_ORIGINAL if get("original_text", "").strip() else 0)
+            )
     
     if missing_line_number:
         print(f"❌ 发现 {len(missing_line_number)} 个条目缺少 line_number 字段")
@@ -67,84 +245,47 @@ def check_mapping_health(mapping_dir: str):
     else:
         print(f"✓ 所有条目都有 line_number 字段")
     
-    # 检查2：line_number 连续性
-    print(f"\n{'-'*60}")
-    print("检查2：line_number 连续性")
-    print(f"{'-'*60}")
+    # 保存行号索引缓存（按文件顺序），标志字节同时用于检查3、4的统计
+    flags = bytes(flags)
+    save_line_index(content_file, line_numbers, flags)
     
-    entries.sort(key=lambda x: x["line_number"])
+    # 检查2的整体验证与检查3、4的统计相互独立，一次并行算完
+    valid, translated_count, original_count = run_parallel_checks(line_numbers, flags)
     
-    discontinuities = []
-    duplicates = []
+    # 检查2：line_number 连续性
+    print_check_header("检查2：line_number 连续性", quiet)
     
-    for i, entry in enumerate(entries):
-        expected = i + 1
-        actual = entry["line_number"]
-        
-        if actual != expected:
-            discontinuities.append({
-                "position": i,
-                "expected": expected,
-                "actual": actual,
-                "key": entry["key"]
-            })
-        
-        # 检查重复
-        if i > 0 and entry["line_number"] == entries[i-1]["line_number"]:
-            duplicates.append({
-                "line_number": actual,
-                "keys": [entries[i-1]["key"], entry["key"]]
-            })
-    
-    if discontinuities:
-        print(f"❌ 发现 {len(discontinuities)} 处 line_number 不连续")
-        print("   前10处不连续位置：")
-        for d in discontinuities[:10]:
-            print(f"     位置 {d['position']}: 期望 {d['expected']}, 实际 {d['actual']} (键: {d['key']})")
-        return False
-    else:
+    # 整体验证失败时才排序并收集详细的诊断信息
+    if valid:
         print(f"✓ line_number 从 1 到 {total_count} 连续递增")
-    
-    if duplicates:
-        print(f"❌ 发现 {len(duplicates)} 处 line_number 重复")
-        for dup in duplicates[:5]:
-            print(f"   line_number {dup['line_number']}: {dup['keys']}")
-        return False
-    else:
         print(f"✓ 没有重复的 line_number")
-    
-    # 检查3：翻译进度统计
-    print(f"\n{'-'*60}")
-    print("检查3：翻译进度统计")
-    print(f"{'-'*60}")
-    
-    translated_count = sum(1 for e in entries if e["translated_text"].strip())
-    empty_count = total_count - translated_count
-    progress = (translated_count / total_count * 100) if total_count > 0 else 0
-    
-    print(f"总行数: {total_count}")
-    print(f"已翻译: {translated_count}")
-    print(f"未翻译: {empty_count}")
-    print(f"进度: {progress:.1f}%")
-    
-    # 检查4：数据完整性
-    print(f"\n{'-'*60}")
-    print("检查4：数据完整性")
-    print(f"{'-'*60}")
-    
-    missing_original = sum(1 for e in entries if not e["original_text"].strip())
-    if missing_original > 0:
-        print(f"⚠ 警告：发现 {missing_original} 行原文为空")
     else:
-        print(f"✓ 所有行都有原文内容")
+        # 只对下标排序，诊断信息通过下标回查行号和键
+        order = sorted(range(len(line_numbers)), key=line_numbers.__getitem__)
+        sorted_line_numbers = [line_numbers[j] for j in order]
+        
+        discontinuity_count, discontinuity_positions, duplicate_positions = find_line_number_issues(
+            sorted_line_numbers
+        )
+        
+        if discontinuity_count:
+            print(f"❌ 发现 {discontinuity_count} 处 line_number 不连续")
+            print("   前10处不连续位置：")
+            for i in discontinuity_positions:
+                print(f"     位置 {i}: 期望 {i + 1}, 实际 {sorted_line_numbers[i]} (键: {keys[order[i]]})")
+            return False
+        
+        if duplicate_positions:
+            print(f"❌ 发现 {len(duplicate_positions)} 处 line_number 重复")
+            for i in duplicate_positions[:5]:
+                print(f"   line_number {sorted_line_numbers[i]}: {[keys[order[i - 1]], keys[order[i]]]}")
+            return False
+    
+    # 检查3、4：翻译进度与数据完整性
+    print_progress_stats(total_count, translated_count, total_count - original_count, quiet)
     
     # 总结
-    print(f"\n{'='*60}")
-    print("健康检查总结")
-    print(f"{'='*60}")
-    print(f"✓ 映射文件健康状态良好")
-    print(f"✓ 原文译文对齐机制正常")
-    print(f"✓ 可以安全进行翻译操作")
+    print_healthy_summary()
     
     return True
 
@@ -155,18 +296,21 @@ def main():
     print(f"EPUB 翻译对齐健康检查工具")
     print(f"{'#'*60}")
     
-    if len(sys.argv) < 2:
-        print("\n用法:")
-        print("  python check_alignment_health.py <mapping目录路径>")
-        print("\n示例:")
-        print("  python check_alignment_health.py mapping/my_book")
-        print("  python check_alignment_health.py D:/projects/epub/mapping/book1")
-        sys.exit(1)
-    
-    mapping_dir = sys.argv[1]
+    parser = argparse.ArgumentParser(
+        description="EPUB 翻译对齐健康检查工具",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+示例:
+  python check_alignment_health.py mapping/my_book
+  python check_alignment_health.py D:/projects/epub/mapping/book1 --quiet
+        """
+    )
+    parser.add_argument("mapping_dir", help="mapping目录路径")
+    parser.add_argument("-q", "--quiet", action="store_true", help="省略各项检查的分节标题")
+    args = parser.parse_args()
     
     try:
-        is_healthy = check_mapping_health(mapping_dir)
+        is_healthy = check_mapping_health(args.mapping_dir, quiet=args.quiet)
         
         if is_healthy:
             print(f"\n{'#'*60}")
@@ -4,8 +4,25 @@
 检查EPUB中的所有文档文件
 """
 
+import sys
+from pathlib import Path
+
 import ebooklib
-from ebooklib import epub
+
+# 把脚本所在目录加入路径：以 python -m tools.xxx 运行或从其他位置导入时也能找到 _epub_cache
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _epub_cache import load_epub
+
+
+def iter_spine_names(book):
+    """逐个产出spine中各项对应的文件名；无法解析的项跳过"""
+    for entry in book.spine:
+        # ebooklib 的spine项通常是 (idref, linear) 元组，也兼容带idref属性的对象
+        ref = entry[0] if isinstance(entry, tuple) else entry
+        idref = getattr(ref, 'idref', ref)
+        spine_item = book.get_item_with_id(idref) if isinstance(idref, str) else None
+        if spine_item is not None:
+            yield spine_item.get_name()
 
 
 def check_epub_items(epub_path: str):
@@ -14,17 +31,13 @@ def check_epub_items(epub_path: str):
     print()
     
     try:
-        book = epub.read_epub(epub_path)
+        book = load_epub(epub_path)
     except Exception as e:
         print(f"❌ 读取失败: {e}")
         return
     
     # 获取所有文档类型的items
-    documents = []
-    for item in book.get_items():
-        if item.get_type() == ebooklib.ITEM_DOCUMENT:
-            name = item.get_name()
-            documents.append(name)
+    documents = [item.get_name() for item in book.get_items_of_type(ebooklib.ITEM_DOCUMENT)]
     
     print(f"📄 文档类型文件总数: {len(documents)}")
     print()
@@ -32,28 +45,15 @@ def check_epub_items(epub_path: str):
     # 检查navigation-documents.xhtml
     nav_files = [d for d in documents if 'navigation' in d.lower()]
     if nav_files:
+        # spine中的文件名只解析一次
+        spine_names = set(iter_spine_names(book))
+        
         print("🔍 找到导航文件:")
         for nf in nav_files:
             print(f"  - {nf}")
             
             # 检查是否在spine中
-            in_spine = False
-            for item in book.spine:
-                if isinstance(item, tuple):
-                    itemref = item[0]
-                else:
-                    itemref = item
-                
-                # 获取文件名
-                if hasattr(itemref, 'idref'):
-                    try:
-                        spine_item = book.get_item_with_id(itemref.idref)
-                        if spine_item and spine_item.get_name() == nf:
-                            in_spine = True
-                            break
-                    except:
-                        pass
-            
+            in_spine = nf in spine_names
             print(f"    在spine中: {'是' if in_spine else '否'}")
         print()
     
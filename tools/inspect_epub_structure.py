@@ -1,61 +1,124 @@
 #!/usr/bin/env python3
 """检查EPUB HTML结构，找出嵌套标签问题"""
 
+import re
 import sys
+from html.entities import name2codepoint
 from pathlib import Path
-from ebooklib import epub
 import ebooklib
-from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
+
+# 把脚本所在目录加入路径：以 python -m tools.xxx 运行或从其他位置导入时也能找到 _epub_cache
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _epub_cache import load_epub
+
+# 块级标签
+BLOCK_TAGS = ("p", "div", "h1", "h2", "h3", "h4", "h5", "h6", "li", "blockquote", "pre")
+# XHTML命名空间下的同名标签（按XML解析时标签名带命名空间）
+_XHTML_NS = "{http://www.w3.org/1999/xhtml}"
+_MATCH_TAGS = BLOCK_TAGS + tuple(_XHTML_NS + tag for tag in BLOCK_TAGS)
+# 注音（ruby）的读音<rt>和括号<rp>：不计入文本，避免假名混入正文
+_RUBY_TAGS = ("rt", "rp", _XHTML_NS + "rt", _XHTML_NS + "rp")
+
+# HTML命名实体（如&nbsp;）：XML只预定义5个，recover模式下其余实体会被直接丢弃
+_XML_ENTITIES = frozenset((b"amp", b"lt", b"gt", b"quot", b"apos"))
+_RE_NAMED_ENTITY = re.compile(rb"&([A-Za-z][A-Za-z0-9]*);")
+
+def _entity_to_charref(match) -> bytes:
+    """把XML未定义的HTML命名实体替换为数字字符引用，未知实体保持原样"""
+    name = match.group(1)
+    if name in _XML_ENTITIES:
+        return match.group(0)
+    codepoint = name2codepoint.get(name.decode("ascii"))
+    return b"&#%d;" % codepoint if codepoint is not None else match.group(0)
+
+def parse_chapter(content: bytes):
+    """解析章节内容，返回根元素
+    
+    优先按XML解析：HTML解析器遇到<p>内的块级标签会自动闭合<p>，把本工具要找的嵌套问题修复掉；
+    XML解析失败时才回退到HTML解析器，并显式按UTF-8解码
+    """
+    try:
+        xml_content = _RE_NAMED_ENTITY.sub(_entity_to_charref, content)
+        root = etree.fromstring(xml_content, etree.XMLParser(recover=True))
+    except etree.XMLSyntaxError:
+        root = None
+    if root is None:
+        root = lxml_html.fromstring(content, parser=lxml_html.HTMLParser(encoding='utf-8'))
+    return root
+
+def local_name(tag) -> str:
+    """去掉命名空间前缀的标签名"""
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else str(tag)
+
+def block_texts(node):
+    """返回块级节点的 (直接文本, 全部文本, 是否嵌套)
+    
+    直接文本为自身文本加各子节点之后的文本（注释、处理指令之后的文本也属于本节点）；
+    任一子元素（不含其后文本）内含非空白文本即为嵌套，仅在嵌套时才递归拼接全部文本
+    """
+    direct_text = (node.text or '') + ''.join(child.tail or '' for child in node)
+    # 注释、处理指令等非元素子节点没有itertext，也不贡献文本，跳过
+    nested = any(
+        text and not text.isspace()
+        for child in node
+        if isinstance(child.tag, str)
+        for text in child.itertext(with_tail=False)
+    )
+    all_text = ''.join(node.itertext()) if nested else direct_text
+    return direct_text, all_text, nested
 
 def inspect_epub_chapter(epub_file: str, chapter_id: str):
     """检查指定章节的HTML结构"""
     
-    book = epub.read_epub(epub_file)
+    book = load_epub(epub_file)
+    
+    # 按文件名索引文档，取第一个名称包含 chapter_id 的章节
+    docs_by_name = {
+        getattr(it, "file_name", None) or getattr(it, "href", None) or it.get_name(): it
+        for it in book.get_items_of_type(ebooklib.ITEM_DOCUMENT)
+    }
+    name = next((n for n in docs_by_name if chapter_id in n), None)
+    if name is None:
+        print(f"❌ 未找到章节: {chapter_id}")
+        return
+    item = docs_by_name[name]
+    
+    print(f"\n{'='*80}")
+    print(f"章节: {name}")
+    print(f"{'='*80}\n")
     
-    for item in book.get_items():
-        if item.get_type() == ebooklib.ITEM_DOCUMENT:
-            name = getattr(item, "file_name", None) or getattr(item, "href", None) or item.get_name()
+    # 用lxml（C实现）解析，按文档顺序只遍历块级标签
+    root = parse_chapter(item.get_content())
+    etree.strip_elements(root, *_RUBY_TAGS, with_tail=False)
+    
+    seq = 1
+    for node in root.iter(*_MATCH_TAGS):
+        direct_text, all_text, nested = block_texts(node)
+        
+        if all_text.strip():
+            child_blocks = [local_name(child.tag) for child in node.iterdescendants(*_MATCH_TAGS)]
+            block = (
+                f"\n--- 序号 {seq:05d} ---\n"
+                f"标签: <{local_name(node.tag)}>\n"
+                f"是否有子标签: {bool(child_blocks)}\n"
+                f"子块级标签: {child_blocks}\n"
+                f"\n直接文本 (recursive=False):\n"
+                f"  {direct_text.strip()}\n"
+                f"\n全部文本 (recursive=True):\n"
+                f"  {all_text.strip()}\n"
+            )
+            
+            # 子标签贡献了文本，说明有嵌套
+            if nested:
+                block += f"\n⚠ 警告：检测到嵌套！全部文本包含了子标签的内容\n"
+            sys.stdout.write(block)
+            
+            seq += 1
             
-            if chapter_id in name:
-                print(f"\n{'='*80}")
-                print(f"章节: {name}")
-                print(f"{'='*80}\n")
-                
-                html = item.get_content().decode("utf-8", errors="ignore")
-                soup = BeautifulSoup(html, "html.parser")
-                
-                # 定义块级标签
-                BLOCK_TAGS = {"p", "div", "h1", "h2", "h3", "h4", "h5", "h6", "li", "blockquote", "pre"}
-                
-                seq = 1
-                for node in soup.find_all(True):
-                    if node.name in BLOCK_TAGS:
-                        # 获取节点的直接文本（不递归）
-                        direct_text = ''.join(node.find_all(string=True, recursive=False))
-                        # 获取所有文本（递归）
-                        all_text = node.get_text()
-                        
-                        if all_text.strip():
-                            print(f"\n--- 序号 {seq:05d} ---")
-                            print(f"标签: <{node.name}>")
-                            print(f"是否有子标签: {bool(node.find_all(BLOCK_TAGS))}")
-                            print(f"子块级标签: {[child.name for child in node.find_all(BLOCK_TAGS)]}")
-                            print(f"\n直接文本 (recursive=False):")
-                            print(f"  {direct_text.strip()}")
-                            print(f"\n全部文本 (recursive=True):")
-                            print(f"  {all_text.strip()}")
-                            
-                            # 如果全部文本和直接文本不同，说明有嵌套
-                            if all_text.strip() != direct_text.strip():
-                                print(f"\n⚠ 警告：检测到嵌套！全部文本包含了子标签的内容")
-                            
-                            seq += 1
-                            
-                            # 只显示前15个块
-                            if seq > 15:
-                                print(f"\n... 省略剩余内容 ...")
-                                break
-                
+            # 只显示前15个块
+            if seq > 15:
+                print(f"\n... 省略剩余内容 ...")
                 break
 
 if __name__ == "__main__":